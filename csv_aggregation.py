@@ -1,115 +1,283 @@
-import pandas as pd
-import os
-
-# Define the expected headers for both weekly and monthly files
-WEEKLY_HEADERS = ["Symbol  ", "Series  ", "Date  ", "Prev Close  ", "Open Price  ", 
-                 "High Price  ", "Low Price  ", "Last Price  ", "Close Price  ", 
-                 "Average Price ", "Total Traded Quantity  ", "Turnover ₹  ", 
-                 "No. of Trades  ", "Deliverable Qty  ", "% Dly Qt to Traded Qty  "]
-
-MONTHLY_HEADERS = ["Symbol  ", "Series  ", "Date  ", "Prev Close  ", "Open Price  ", 
-                  "High Price  ", "Low Price  ", "Last Price  ", "Close Price  ", 
-                  "Average Price ", "Total Traded Quantity  ", "Turnover ₹  ", 
-                  "No. of Trades  ", "Deliverable Qty  ", "% Dly Qt to Traded Qty  "]
-
-def check_headers(input_df, expected_headers):
-    """Check if input CSV headers match expected headers"""
-    input_headers = list(input_df.columns)
-    return input_headers == expected_headers
-
-def process_csv(input_filename, target_filename, expected_headers):
-    """Process the CSV file and append data if headers match and data is not duplicate"""
-    try:
-        # Get the directory of the script
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        input_file = os.path.join(script_dir, input_filename)
-        target_file = os.path.join(script_dir, target_filename)
-        
-        # Check if input file exists
-        if not os.path.exists(input_file):
-            print(f"Error: File '{input_filename}' not found in the script directory")
-            return False
-        
-        # Read the input CSV file
-        input_df = pd.read_csv(input_file)
-        print(f"Input file rows: {len(input_df)}")
-        
-        # Check if headers match
-        if not check_headers(input_df, expected_headers):
-            print("Error: CSV headers do not match the expected format")
-            print("Expected headers:", expected_headers)
-            print("Found headers:", list(input_df.columns))
-            return False
-        
-        # Handle the target file
-        if os.path.exists(target_file):
-            # Read existing data
-            existing_df = pd.read_csv(target_file)
-            print(f"Existing file rows before append: {len(existing_df)}")
-            
-            # Check for duplicates based on Date column
-            existing_dates = set(existing_df["Date  "].astype(str))
-            new_data = input_df[~input_df["Date  "].astype(str).isin(existing_dates)]
-            
-            if len(new_data) == 0:
-                print("No new data to append - all dates already exist in target file")
-                return True
-            
-            print(f"New unique rows to append: {len(new_data)}")
-            
-            # Append new data
-            updated_df = pd.concat([existing_df, new_data], ignore_index=True)
-            print(f"Total rows after append: {len(updated_df)}")
-            
-            # Write back to file
-            updated_df.to_csv(target_file, mode='w', index=False)
-        else:
-            # If file doesn't exist, create it with the input data
-            input_df.to_csv(target_file, mode='w', index=False)
-            print(f"New file created with rows: {len(input_df)}")
-            new_data = input_df  # For consistency in verification
-        
-        # Verify the result
-        result_df = pd.read_csv(target_file)
-        print(f"Final file rows: {len(result_df)}")
-        print(f"Successfully processed and appended data to {target_filename}")
-        return True
-    
-    except Exception as e:
-        print(f"Error processing file: {str(e)}")
-        return False
-
-def main():
-    print("CSV Data Processing System")
-    print("1. Process Weekly Data")
-    print("2. Process Monthly Data")
-    
-    while True:
-        choice = input("Enter your choice (1 or 2): ")
-        
-        if choice in ['1', '2']:
-            break
-        print("Invalid choice. Please enter 1 or 2.")
-    
-    # Get input filename
-    input_filename = input("Enter the CSV filename (must be in same directory as script): ")
-    
-    # Add .csv extension if not provided
-    if not input_filename.lower().endswith('.csv'):
-        input_filename += '.csv'
-    
-    # Process based on user choice
-    if choice == '1':
-        target_filename = "etf_week.csv"
-        success = process_csv(input_filename, target_filename, WEEKLY_HEADERS)
-    else:
-        target_filename = "etf_month.csv"
-        success = process_csv(input_filename, target_filename, MONTHLY_HEADERS)
-    
-    if success:
-        print("Processing completed successfully")
-    else:
-        print("Processing failed")
-
-if __name__ == "__main__":
+import pandas as pd
+import os
+import sys
+import glob
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from history_store import DATE_FORMAT, init_store, open_writer, add_rows, start_background_compaction, compact_store
+from history_db import insert_raw_rows
+from schemas import DATA_DIR, SCHEMAS, match_headers
+
+def check_headers(input_df, expected_headers):
+    """Map the input CSV headers to their registry names, or None if they do not match"""
+    return match_headers(list(input_df.columns), expected_headers)
+
+def dataset_name(target_file):
+    """Registry name of a target file, e.g. etf_week.csv -> etf_week"""
+    return os.path.splitext(os.path.basename(target_file))[0]
+
+def destination(target_file, db_path=None):
+    """Where rows for a target end up, for progress messages"""
+    if db_path:
+        return f"{dataset_name(target_file)} in {db_path}"
+    return os.path.basename(target_file)
+
+def commit_rows(input_df, target_file, db_path=None):
+    """Publish the rows whose (symbol, date) key is not in the target yet; returns the count"""
+    if db_path:
+        return insert_raw_rows(db_path, dataset_name(target_file), input_df)
+    store_dir = init_store(target_file)
+    connection = open_writer(store_dir)
+    try:
+        return add_rows(connection, store_dir, input_df)
+    finally:
+        connection.close()
+
+def stream_csv(input_file, target_file, expected_headers, chunk_rows=100000, db_path=None):
+    """Ingest a file chunk by chunk in bounded memory; returns (rows committed, rows appended, error).
+    A chunk that fails validation commits nothing, but the chunks before it stay committed."""
+    rows_read = appended = 0
+    store_dir = None if db_path else init_store(target_file)
+    connection = None if db_path else open_writer(store_dir)
+    try:
+        for chunk_number, chunk in enumerate(pd.read_csv(input_file, dtype=str, chunksize=chunk_rows)):
+            if chunk_number == 0 and check_headers(chunk, expected_headers) is None:
+                raise ValueError(f"CSV headers do not match the expected format, found {list(chunk.columns)}")
+            
+            # Each chunk is published with its keys, so an interrupted run
+            # leaves a consistent prefix that a rerun skips over
+            if db_path:
+                appended += insert_raw_rows(db_path, dataset_name(target_file), chunk)
+            else:
+                appended += add_rows(connection, store_dir, chunk)
+            rows_read += len(chunk)
+    except ValueError as e:
+        # pandas appends multi-line format hints to date parsing errors
+        return rows_read, appended, str(e).splitlines()[0].removesuffix(" You might want to try:")
+    finally:
+        if connection:
+            connection.close()
+    return rows_read, appended, None
+
+def process_csv(input_filename, target_filename, expected_headers):
+    """Process the CSV file and append data if headers match and data is not duplicate"""
+    try:
+        # Both files live in the dashboard's data directory
+        input_file = os.path.join(DATA_DIR, input_filename)
+        target_file = os.path.join(DATA_DIR, target_filename)
+        
+        # Check if input file exists
+        if not os.path.exists(input_file):
+            print(f"Error: File '{input_filename}' not found in {DATA_DIR}")
+            return False
+        
+        # Read the input CSV file, keeping values exactly as downloaded
+        input_df = pd.read_csv(input_file, dtype=str)
+        print(f"Input file rows: {len(input_df)}")
+        
+        # Check if headers match
+        if check_headers(input_df, expected_headers) is None:
+            print("Error: CSV headers do not match the expected format")
+            print("Expected headers:", expected_headers)
+            print("Found headers:", list(input_df.columns))
+            return False
+        
+        # Append only rows whose (symbol, date) is not in the persistent key index
+        appended = commit_rows(input_df, target_file)
+        if appended == 0:
+            print("No new data to append - all symbol/date rows already exist in target file")
+            return True
+        
+        print(f"New unique rows appended: {appended}")
+        print(f"Successfully processed and appended data to {target_filename}")
+        start_background_compaction(init_store(target_file))
+        return True
+    
+    except Exception as e:
+        print(f"Error processing file: {str(e)}")
+        return False
+
+# Batch target name -> (target filename, expected headers). "daily" feeds
+# the canonical daily series the pages resample; weekly and monthly are
+# the older overlapping downloads.
+TARGETS = {
+    "daily": ("etf_daily.csv", SCHEMAS["etf_daily"]["headers"]),
+    "weekly": ("etf_week.csv", SCHEMAS["etf_week"]["headers"]),
+    "monthly": ("etf_month.csv", SCHEMAS["etf_month"]["headers"])
+}
+
+def expand_inputs(patterns):
+    """Expand directories and glob patterns into a sorted list of CSV files"""
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            files.update(glob.glob(os.path.join(pattern, "*.csv")))
+        else:
+            files.update(path for path in glob.glob(pattern) if os.path.isfile(path))
+    return sorted(files)
+
+def parse_input_file(input_file, expected_headers):
+    """Read and validate one input file; runs in a worker process"""
+    start = time.perf_counter()
+    result = {"file": input_file, "data": None, "error": None, "rows": 0,
+              "bytes": os.path.getsize(input_file), "seconds": 0.0}
+    try:
+        input_df = pd.read_csv(input_file, dtype=str)
+        mapping = check_headers(input_df, expected_headers)
+        if mapping is None:
+            result["error"] = f"CSV headers do not match the expected format, found {list(input_df.columns)}"
+        else:
+            # Registry names let files with differently padded headers be merged
+            input_df = input_df.rename(columns=mapping)
+            # Parsing the dates here validates them and lets the merge sort by date
+            input_df["_date"] = pd.to_datetime(input_df["Date"].str.strip(), format=DATE_FORMAT)
+            result["data"] = input_df
+            result["rows"] = len(input_df)
+    except Exception as e:
+        result["error"] = str(e)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+def ingest_batch(input_files, target_file, expected_headers, workers=None, db_path=None):
+    """Parse input files in parallel, merge them in date order and append them in one write"""
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(parse_input_file, input_files, [expected_headers] * len(input_files)))
+    
+    frames = []
+    for result in results:
+        megabytes = result["bytes"] / 1e6
+        if result["error"]:
+            print(f"  SKIPPED {result['file']}: {result['error']}")
+            continue
+        rate = result["rows"] / result["seconds"] if result["seconds"] else 0
+        print(f"  {result['file']}: {result['rows']} rows, {megabytes:.2f} MB "
+              f"in {result['seconds']:.3f}s ({rate:,.0f} rows/s)")
+        frames.append(result["data"])
+    
+    if not frames:
+        print("No valid input files")
+        return 0
+    
+    merged = pd.concat(frames, ignore_index=True).sort_values("_date", kind="mergesort")
+    appended = commit_rows(merged.drop(columns="_date"), target_file, db_path)
+    
+    elapsed = time.perf_counter() - start
+    total_rows = sum(result["rows"] for result in results)
+    print(f"Parsed {total_rows} rows from {len(frames)}/{len(results)} files, "
+          f"appended {appended} new rows to {destination(target_file, db_path)} "
+          f"in {elapsed:.2f}s ({total_rows / elapsed:,.0f} rows/s)")
+    return appended
+
+def stream_batch(input_files, target_file, expected_headers, chunk_rows, db_path=None):
+    """Stream input files one after another in bounded memory"""
+    start = time.perf_counter()
+    total_rows = total_appended = 0
+    for input_file in input_files:
+        file_start = time.perf_counter()
+        rows, appended, error = stream_csv(input_file, target_file, expected_headers, chunk_rows, db_path)
+        total_rows += rows
+        total_appended += appended
+        if error and rows == 0:
+            print(f"  SKIPPED {input_file}: {error}")
+            continue
+        if error:
+            # Earlier chunks were already published; a rerun skips them
+            print(f"  STOPPED {input_file} after its first {rows} rows ({appended} appended): {error}")
+            continue
+        seconds = time.perf_counter() - file_start
+        rate = rows / seconds if seconds else 0
+        print(f"  {input_file}: {rows} rows, {appended} appended, "
+              f"{os.path.getsize(input_file) / 1e6:.2f} MB in {seconds:.3f}s ({rate:,.0f} rows/s)")
+    
+    elapsed = time.perf_counter() - start
+    print(f"Streamed {total_rows} rows, appended {total_appended} new rows to "
+          f"{destination(target_file, db_path)} in {elapsed:.2f}s ({total_rows / elapsed:,.0f} rows/s)")
+    return total_appended
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(description="Ingest bhavcopy CSV downloads into the history files")
+    parser.add_argument("target", choices=list(TARGETS), help="history file to append to")
+    parser.add_argument("inputs", nargs="*", help="CSV files, directories or glob patterns")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: CPU count)")
+    parser.add_argument("--data-dir", default=DATA_DIR,
+                        help="directory holding the history files (default: STOCKS_DATA_DIR or the script directory)")
+    parser.add_argument("--chunk-rows", type=int, default=None,
+                        help="stream each file in chunks of this many rows, in bounded memory")
+    parser.add_argument("--compact", action="store_true", help="only merge the target's small segments")
+    parser.add_argument("--no-compact", action="store_true", help="skip the background compaction after ingest")
+    parser.add_argument("--backend", choices=["files", "sqlite"], default="files",
+                        help="write to the segment store (files) or straight into the SQLite database")
+    parser.add_argument("--db", default=os.environ.get("STOCKS_HISTORY_DB"),
+                        help="SQLite database (default: STOCKS_HISTORY_DB or history.sqlite in the data directory)")
+    args = parser.parse_args(argv)
+    
+    target_filename, expected_headers = TARGETS[args.target]
+    target_file = os.path.join(args.data_dir, target_filename)
+    if args.compact:
+        merged = compact_store(init_store(target_file))
+        print(f"Compacted {merged} segments of {target_filename}")
+        return True
+    
+    input_files = expand_inputs(args.inputs)
+    if not input_files:
+        print("Error: no CSV files matched the given inputs")
+        return False
+    
+    db_path = None
+    if args.backend == "sqlite":
+        db_path = args.db or os.path.join(args.data_dir, "history.sqlite")
+    
+    print(f"Ingesting {len(input_files)} files into {destination(target_file, db_path)}")
+    try:
+        if args.chunk_rows:
+            stream_batch(input_files, target_file, expected_headers, args.chunk_rows, db_path)
+        else:
+            ingest_batch(input_files, target_file, expected_headers, args.workers, db_path)
+    except Exception as e:
+        print(f"Error processing files: {str(e)}")
+        return False
+    
+    # Merge the small segments this run added without holding up the summary
+    if not args.no_compact and not db_path:
+        start_background_compaction(init_store(target_file))
+    return True
+
+def interactive_main():
+    print("CSV Data Processing System")
+    print("1. Process Weekly Data")
+    print("2. Process Monthly Data")
+    print("3. Process Daily Data")
+    
+    while True:
+        choice = input("Enter your choice (1, 2 or 3): ")
+        
+        if choice in ['1', '2', '3']:
+            break
+        print("Invalid choice. Please enter 1, 2 or 3.")
+    
+    # Get input filename
+    input_filename = input("Enter the CSV filename (must be in the data directory): ")
+    
+    # Add .csv extension if not provided
+    if not input_filename.lower().endswith('.csv'):
+        input_filename += '.csv'
+    
+    # Process based on user choice
+    target_filename, expected_headers = TARGETS[{'1': "weekly", '2': "monthly", '3': "daily"}[choice]]
+    success = process_csv(input_filename, target_filename, expected_headers)
+    
+    if success:
+        print("Processing completed successfully")
+    else:
+        print("Processing failed")
+
+def main():
+    # Arguments select the non-interactive batch mode
+    if len(sys.argv) > 1:
+        sys.exit(0 if batch_main(sys.argv[1:]) else 1)
+    interactive_main()
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,579 @@
+import pandas as pd
+import numpy as np
+import streamlit as st
+import os
+import threading
+from types import MappingProxyType
+from schemas import DATA_DIR, SCHEMAS, DAILY_SOURCES, read_csv_with_schema
+from history_store import MANIFEST, store_dir_for, read_store
+from ohlcv_store import write_ohlcv_store, open_ohlcv_store, read_symbol
+from history_db import query_symbol, query_dataset, database_revision, list_datasets
+from screener import build_screen_columns, screen
+from indicators import update_indicators
+from risk import (build_panel, extend_panel, panel_view, period_returns, weekly_closes,
+                  rolling_volatility, drawdowns, correlation_matrix, align_panel, benchmark_statistics)
+
+# pyarrow is optional; without it every load parses the CSVs
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Where per-symbol history is read from: "files" (the CSVs or segment stores
+# through a memory-mapped OHLCV store) or "sqlite" (see history_db.py)
+HISTORY_BACKEND = os.environ.get("STOCKS_HISTORY_BACKEND", "files")
+HISTORY_DB = os.environ.get("STOCKS_HISTORY_DB", os.path.join(DATA_DIR, "history.sqlite"))
+
+# Views handed out from the shared store must never write back into it.
+# Copy-on-write is always on from pandas 3; enable it on older versions.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# Bump when parsing changes so stale columnar caches are rebuilt
+CACHE_VERSION = 3
+
+# Bump when indicator definitions change so stored indicators are recomputed from scratch
+INDICATOR_VERSION = 1
+
+def source_path(csv_path):
+    """The history store manifest replacing a CSV once ingest has created it, else the CSV"""
+    manifest_path = os.path.join(store_dir_for(csv_path), MANIFEST)
+    return manifest_path if os.path.exists(manifest_path) else csv_path
+
+def parse_source(name, csv_path):
+    """Parse a dataset's CSV, or its history store segments, through its registry schema"""
+    if source_path(csv_path) != csv_path:
+        return read_store(store_dir_for(csv_path), SCHEMAS[name])
+    return read_csv_with_schema(csv_path, SCHEMAS[name])
+
+def source_signature(csv_path):
+    """Identify a dataset revision by the modification time and size of its source"""
+    path = source_path(csv_path)
+    stat = os.stat(path)
+    return f"{CACHE_VERSION}:{os.path.basename(path)}:{stat.st_mtime_ns}:{stat.st_size}".encode()
+
+def dataset_path(name):
+    return os.path.join(DATA_DIR, SCHEMAS[name]["filename"])
+
+def dataset_signature(name):
+    """Current revision of a dataset's source; every shared-store cache is keyed on it"""
+    return source_signature(dataset_path(name))
+
+def read_columnar_cache(cache_path, signature):
+    """Return the cached frame if it was written from the current CSV revision"""
+    if pq is None or not os.path.exists(cache_path):
+        return None
+    try:
+        metadata = pq.read_schema(cache_path).metadata or {}
+        if metadata.get(b'source_signature') != signature:
+            return None
+        return pq.read_table(cache_path).to_pandas()
+    except (OSError, pa.ArrowException):
+        return None
+
+def read_cache_signature(cache_path):
+    """The source signature a columnar cache was written with, or None"""
+    if pq is None or not os.path.exists(cache_path):
+        return None
+    try:
+        return (pq.read_schema(cache_path).metadata or {}).get(b'source_signature')
+    except (OSError, pa.ArrowException):
+        return None
+
+def write_columnar_cache(df, cache_path, signature):
+    """Write the parsed frame next to its CSV, tagged with the CSV revision"""
+    if pq is None:
+        return
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'source_signature': signature})
+        temp_path = cache_path + '.tmp'
+        pq.write_table(table, temp_path)
+        os.replace(temp_path, cache_path)
+    except (OSError, pa.ArrowException):
+        # The cache is only an accelerator; a read-only data directory is fine
+        pass
+
+# Read one revision of a dataset into the shared store
+@st.cache_resource(max_entries=32)
+def read_dataset(name, signature):
+    """Load a dataset from its columnar cache, parsing the source only when it changed"""
+    csv_path = dataset_path(name)
+    cache_path = os.path.splitext(csv_path)[0] + '.parquet'
+    df = read_columnar_cache(cache_path, signature)
+    if df is None:
+        df = parse_source(name, csv_path)
+        write_columnar_cache(df, cache_path, signature)
+    return df
+
+def read_only_view(df):
+    """Return a zero-copy view whose writes are copied instead of reaching the shared frame"""
+    return df.iloc[:]
+
+# Load the current revision of one dataset
+def load_dataset(name):
+    return read_only_view(read_dataset(name, dataset_signature(name)))
+
+# Build per-symbol offsets into a history frame
+def build_history_index(history, symbol_column):
+    """Sort a history frame by symbol and date and record each symbol's row range"""
+    history = history.assign(_key=history[symbol_column].str.strip().str.upper())
+    history = history.sort_values(['_key', 'Date'], kind='mergesort', ignore_index=True)
+    offsets = {key: (rows[0], rows[-1] + 1) for key, rows in history.groupby('_key').indices.items()}
+    return history.drop(columns='_key'), MappingProxyType(offsets)
+
+# Slice one symbol's history without masking or sorting
+def get_history_slice(history, offsets, symbol):
+    start, stop = offsets.get(symbol, (0, 0))
+    return history.iloc[start:stop]
+
+# Index one revision of a history dataset into the shared store
+@st.cache_resource(max_entries=16)
+def read_history(name, signature):
+    return build_history_index(read_dataset(name, signature), SCHEMAS[name]["symbol_column"])
+
+# Load a history dataset with its offset table
+def load_history(name):
+    history, offsets = read_history(name, dataset_signature(name))
+    return read_only_view(history), offsets
+
+# Memory-map a history dataset's binary OHLCV store
+@st.cache_resource(max_entries=16)
+def open_ohlcv(name, signature):
+    """Open the store for this source revision, building it from that revision's parsed history if stale"""
+    csv_path = dataset_path(name)
+    store = open_ohlcv_store(csv_path, signature.decode())
+    if store is None:
+        # Built from the revision the store is tagged with, never an older cached one
+        history, offsets = read_history(name, signature)
+        try:
+            write_ohlcv_store(csv_path, history, offsets, SCHEMAS[name]["ohlcv_columns"], signature.decode())
+        except OSError:
+            return None
+        store = open_ohlcv_store(csv_path, signature.decode())
+    return store
+
+# Read one symbol's OHLCV history from a dataset revision
+def read_symbol_history(name, signature, symbol):
+    if HISTORY_BACKEND == "sqlite":
+        return query_symbol(HISTORY_DB, name, symbol)
+    
+    # The memory-mapped store lets worker processes share the OS page cache
+    store = open_ohlcv(name, signature)
+    if store is None:
+        # Read-only data directory: fall back to the parsed history
+        history, offsets = read_history(name, signature)
+        return read_only_view(get_history_slice(history, offsets, symbol))
+    records, index = store
+    return read_symbol(records, index, symbol)
+
+# Pandas offset of each bar timeframe; daily bars are the base series
+TIMEFRAMES = {"D": None, "W": "W-FRI", "M": "ME", "Q": "QE", "Y": "YE"}
+
+def dataset_exists(name):
+    return os.path.exists(source_path(dataset_path(name)))
+
+# Non-empty history tables of one database revision
+@st.cache_resource(max_entries=4)
+def read_database_datasets(revision):
+    return frozenset(list_datasets(HISTORY_DB))
+
+def daily_signature(kind):
+    """(name, revision) of every source feeding an instrument type's daily series, from the configured backend"""
+    if HISTORY_BACKEND == "sqlite":
+        # Any commit to the database changes its revision
+        revision = database_revision(HISTORY_DB)
+        datasets = read_database_datasets(revision)
+        return tuple((name, revision) for name in DAILY_SOURCES[kind] if name in datasets)
+    return tuple((name, dataset_signature(name)) for name in DAILY_SOURCES[kind] if dataset_exists(name))
+
+# Merge the overlapping history downloads into one daily series
+def build_daily_series(frames):
+    """Concatenate per-source rows, keeping the first source's row for each date"""
+    daily = pd.concat(frames, ignore_index=True)
+    daily = daily.drop_duplicates("Date", keep="first")
+    return daily.sort_values("Date", kind="mergesort", ignore_index=True)
+
+# Aggregate daily OHLCV bars into a coarser timeframe
+def resample_ohlcv(daily, columns, timeframe):
+    """Open of the first day, high/low extremes, close of the last day and summed volume per period"""
+    rule = TIMEFRAMES[timeframe]
+    if rule is None or daily.empty:
+        return daily
+    open_column, high_column, low_column, close_column, volume_column = columns
+    aggregations = {open_column: "first", high_column: "max", low_column: "min", close_column: "last"}
+    if volume_column:
+        aggregations[volume_column] = "sum"
+    bars = daily.set_index("Date").resample(rule).agg(aggregations)
+    # Periods without a trading day (e.g. holiday weeks) have no bar
+    return bars.dropna(subset=[close_column]).reset_index()
+
+# Build one symbol's bars for a timeframe into the shared store
+@st.cache_resource(max_entries=1024)
+def read_bars(kind, symbol, timeframe, signature):
+    """Keyed on the source revisions, so an ingest replaces the cached bars"""
+    columns = SCHEMAS[DAILY_SOURCES[kind][0]]["ohlcv_columns"]
+    if not signature:
+        return pd.DataFrame(columns=["Date"] + [column for column in columns if column])
+    daily = build_daily_series([read_symbol_history(name, revision, symbol) for name, revision in signature])
+    return resample_ohlcv(daily, columns, timeframe)
+
+# Load one symbol's OHLCV bars
+def load_bars(kind, symbol, timeframe="D"):
+    """Bars of an "etf" or "index" symbol at a timeframe in TIMEFRAMES"""
+    return read_only_view(read_bars(kind, symbol, timeframe, daily_signature(kind)))
+
+# Build the daily prices of every symbol of an instrument type
+@st.cache_resource(max_entries=4)
+def read_daily_prices(kind, signature):
+    """Close, high and low of all symbols by normalized symbol and date, merged like build_daily_series"""
+    frames = []
+    # Read exactly the revisions in the cache key, so nothing derived from it is stale
+    for name, revision in signature:
+        history = query_dataset(HISTORY_DB, name) if HISTORY_BACKEND == "sqlite" else read_dataset(name, revision)
+        _, high_column, low_column, close_column, _ = SCHEMAS[name]["ohlcv_columns"]
+        frames.append(pd.DataFrame({"_key": history[SCHEMAS[name]["symbol_column"]].str.strip().str.upper(),
+                                    "Date": history["Date"], "close": history[close_column],
+                                    "high": history[high_column], "low": history[low_column]}))
+    if not frames:
+        return pd.DataFrame({"_key": pd.Series(dtype=str), "Date": pd.Series(dtype="datetime64[ns]"),
+                             "close": pd.Series(dtype=float), "high": pd.Series(dtype=float),
+                             "low": pd.Series(dtype=float)})
+    prices = pd.concat(frames, ignore_index=True).drop_duplicates(["_key", "Date"], keep="first")
+    return prices.sort_values(["_key", "Date"], kind="mergesort", ignore_index=True)
+
+# Compute indicators for every symbol into the shared store
+@st.cache_resource(max_entries=4)
+def read_indicators(kind, signature):
+    """Load this snapshot's indicators, extending the stored ones when ingest only appended rows"""
+    cache_path = os.path.join(DATA_DIR, f"{kind}_indicators.parquet")
+    cache_signature = f"{INDICATOR_VERSION}:".encode() + b"|".join(revision for _, revision in signature)
+    stored_signature = read_cache_signature(cache_path)
+    indicators = None
+    if stored_signature == cache_signature:
+        indicators = read_columnar_cache(cache_path, cache_signature)
+    if indicators is None:
+        previous = None
+        if stored_signature and stored_signature.startswith(f"{INDICATOR_VERSION}:".encode()):
+            previous = read_columnar_cache(cache_path, stored_signature)
+        indicators = update_indicators(read_daily_prices(kind, signature), previous)
+        write_columnar_cache(indicators, cache_path, cache_signature)
+    return build_history_index(indicators, "_key")
+
+# Load one symbol's daily indicators
+def load_indicators(kind, symbol):
+    indicators, offsets = read_indicators(kind, daily_signature(kind))
+    return read_only_view(get_history_slice(indicators, offsets, symbol))
+
+# Holder of an instrument type's date x symbol close panel
+@st.cache_resource
+def price_panel_holder(kind):
+    return {"lock": threading.Lock(), "panel": None, "signature": None}
+
+# Load the date x symbol close panel
+def load_price_panel(kind):
+    """(dates, symbols, close) of every symbol, pivoted once and extended in place as new dates are ingested"""
+    signature = daily_signature(kind)
+    holder = price_panel_holder(kind)
+    with holder["lock"]:
+        if holder["signature"] != signature:
+            prices = read_daily_prices(kind, signature)
+            if holder["panel"] is None or not extend_panel(holder["panel"], prices):
+                holder["panel"] = build_panel(prices)
+            holder["signature"] = signature
+        return panel_view(holder["panel"])
+
+# Compute per-symbol risk metrics for the current snapshot
+@st.cache_resource(max_entries=4)
+def read_risk_metrics(kind, signature, volatility_window=20):
+    dates, symbols, close = load_price_panel(kind)
+    daily = period_returns(close)
+    _, week_close = weekly_closes(dates, close)
+    weekly = period_returns(week_close)
+    drawdown = drawdowns(close)
+    nan_row = np.full(len(symbols), np.nan)
+    with np.errstate(invalid='ignore'):
+        metrics = pd.DataFrame({
+            "Daily Return %": (daily[-1] if len(daily) else nan_row) * 100,
+            "Weekly Return %": (weekly[-1] if len(weekly) else nan_row) * 100,
+            f"Volatility {volatility_window}D %": (rolling_volatility(daily, volatility_window)[-1]
+                                                   if len(daily) > volatility_window else nan_row) * 100,
+            "Drawdown %": (drawdown[-1] if len(drawdown) else nan_row) * 100,
+            "Max Drawdown %": (np.fmin.reduce(drawdown, axis=0) if len(drawdown) else nan_row) * 100,
+            "Trading Days": np.count_nonzero(~np.isnan(close), axis=0)
+        }, index=symbols)
+    return metrics
+
+def load_risk_metrics(kind):
+    """Latest daily and weekly return, annualized volatility and drawdowns of every symbol"""
+    return read_only_view(read_risk_metrics(kind, daily_signature(kind)))
+
+# Correlate a group of symbols' daily returns
+@st.cache_resource(max_entries=64)
+def read_correlation(kind, signature, symbols):
+    dates, panel_symbols, close = load_price_panel(kind)
+    columns = panel_symbols.get_indexer(list(symbols))
+    present = [symbol for symbol, column in zip(symbols, columns) if column >= 0]
+    returns = period_returns(close[:, columns[columns >= 0]])
+    return pd.DataFrame(correlation_matrix(returns), index=present, columns=present)
+
+def load_correlation(kind, symbols):
+    """Correlation matrix of the given symbols' daily returns over their common dates"""
+    return read_only_view(read_correlation(kind, daily_signature(kind), tuple(symbols)))
+
+# Indices every stock is measured against
+BENCHMARKS = ("NIFTY 50", "NIFTY 100", "NIFTY BANK")
+BENCHMARK_STATISTICS = ("beta", "alpha", "relative_strength")
+
+# Compute every stock's statistics against each benchmark into the shared store
+@st.cache_resource(max_entries=2)
+def read_benchmark_statistics(signature, window=60):
+    dates, symbols, close = load_price_panel("etf")
+    index_dates, indices, index_close = load_price_panel("index")
+    columns = indices.get_indexer(list(BENCHMARKS))
+    benchmark_close = np.full((len(dates), len(BENCHMARKS)), np.nan)
+    benchmark_close[:, columns >= 0] = align_panel(index_dates, index_close[:, columns[columns >= 0]], dates)
+    returns, benchmark_returns = period_returns(close), period_returns(benchmark_close)
+    statistics = {}
+    for position, benchmark in enumerate(BENCHMARKS):
+        for name, values in benchmark_statistics(returns, benchmark_returns[:, position], window).items():
+            statistics[(benchmark, name)] = values[-1] if len(values) else np.full(len(symbols), np.nan)
+    return pd.DataFrame(statistics, index=symbols)
+
+def load_benchmark_statistics():
+    """Latest trailing beta, alpha and relative strength of every stock against each benchmark"""
+    signature = (daily_signature("etf"), daily_signature("index"))
+    return read_only_view(read_benchmark_statistics(signature))
+
+def load_symbol_benchmarks(symbol):
+    """One stock's statistics, one row per benchmark"""
+    statistics = load_benchmark_statistics()
+    symbol = symbol.strip().upper()
+    if symbol not in statistics.index:
+        return pd.DataFrame(index=list(BENCHMARKS), columns=list(BENCHMARK_STATISTICS), dtype=float)
+    return statistics.loc[symbol].unstack().reindex(index=list(BENCHMARKS), columns=list(BENCHMARK_STATISTICS))
+
+# Build symbol-keyed snapshot index
+def build_snapshot_index(high_low_data, pe_data, traded_data):
+    """Merge the 52-week, P/E and traded rows into one record per normalized symbol"""
+    snapshot_index = {}
+    for table, symbol_column in [(high_low_data, 'SYMBOL'), (pe_data, 'SYMBOL'), (traded_data, 'Symbol')]:
+        keys = table[symbol_column].str.strip().str.upper()
+        # Keep the first row when a table lists a symbol twice
+        first_rows = ~keys.duplicated()
+        table = table[first_rows].set_index(keys[first_rows])
+        for key, record in table.to_dict('index').items():
+            snapshot_index.setdefault(key, {}).update(record)
+    return MappingProxyType({key: MappingProxyType(record) for key, record in snapshot_index.items()})
+
+# Datasets making up the market snapshot, in the order the snapshot tables join them
+SNAPSHOT_DATASETS = ("high_low", "pe", "traded")
+
+def snapshot_signature():
+    """Revisions of the snapshot datasets; every snapshot-derived cache is keyed on it"""
+    return tuple(dataset_signature(name) for name in SNAPSHOT_DATASETS)
+
+def read_snapshot_datasets(signature):
+    return [read_dataset(name, revision) for name, revision in zip(SNAPSHOT_DATASETS, signature)]
+
+# Build the merged snapshot index into the shared store
+@st.cache_resource(max_entries=2)
+def read_snapshot_index(signature):
+    return build_snapshot_index(*read_snapshot_datasets(signature))
+
+# Load the merged snapshot index
+def load_snapshot_index():
+    return read_snapshot_index(snapshot_signature())
+
+# Market-cap buckets in display order
+MARKET_CAP_CLASSES = ("Large-cap", "Mid-cap", "Small-cap")
+
+# Classify every traded symbol by market cap
+def build_market_cap_classes(traded_data):
+    """Large above ₹50,000 Cr, Mid from ₹16,000 to ₹50,000 Cr, Small below, N/A when unknown"""
+    market_cap = traded_data['Mkt Cap (₹ Crores)'].to_numpy()
+    classes = np.select([market_cap > 50000, market_cap >= 16000, market_cap < 16000],
+                        ["Large-cap", "Mid-cap", "Small-cap"], default="N/A")
+    keys = traded_data['Symbol'].str.strip().str.upper()
+    # Keep the first row when the table lists a symbol twice, as the snapshot index does
+    first_rows = ~keys.duplicated().to_numpy()
+    return MappingProxyType(dict(zip(keys[first_rows], classes[first_rows].tolist())))
+
+# Classify one revision of the traded symbols into the shared store
+@st.cache_resource(max_entries=2)
+def read_market_cap_classes(signature):
+    return build_market_cap_classes(read_dataset("traded", signature))
+
+# Load the market-cap class of every traded symbol
+def load_market_cap_classes():
+    return read_market_cap_classes(dataset_signature("traded"))
+
+def format_or_na(values, template):
+    return values.map(lambda value: "N/A" if pd.isna(value) else template.format(value))
+
+# Build the home page card table
+def build_card_table(high_low_data, pe_data, traded_data, market_cap_classes):
+    """One row per normalized symbol with the values and display strings a card shows"""
+    frames = []
+    for table, symbol_column in [(high_low_data, 'SYMBOL'), (pe_data, 'SYMBOL'), (traded_data, 'Symbol')]:
+        keys = table[symbol_column].str.strip().str.upper()
+        first_rows = ~keys.duplicated()
+        frames.append(table[first_rows].drop(columns=symbol_column).set_index(keys[first_rows]))
+    joined = pd.concat(frames, axis=1, join='outer')
+    
+    percent_change = joined['%chng']
+    cards = pd.DataFrame({
+        "ltp": joined['LTP'],
+        "percent_change": percent_change,
+        "pe_ratio": joined['ADJUSTED P/E'],
+        "market_cap_value": joined['Mkt Cap (₹ Crores)'],
+        "value_traded": joined['Value (₹ Crores)'],
+        "volume": joined['Volume (Lakhs)'],
+        "week_52_high": joined['Adjusted 52_Week_High'],
+        "week_52_low": joined['Adjusted 52_Week_Low'],
+        "market_cap_class": joined.index.map(lambda symbol: market_cap_classes.get(symbol, "N/A")),
+        # Placeholder until a dividend source is added
+        "dividend_yield": np.random.uniform(1, 5, len(joined)).round(2)
+    }, index=joined.index)
+    cards["price_display"] = format_or_na(cards["ltp"], "₹{:,.2f}")
+    cards["change_display"] = format_or_na(percent_change, "{:+.2f}%")
+    cards["change_class"] = np.where(percent_change > 0, "positive", "negative")
+    cards["triangle"] = np.where(percent_change > 0, "▲", "▼")
+    cards["pe_display"] = format_or_na(cards["pe_ratio"], "{}")
+    cards["yield_display"] = cards["dividend_yield"].map("{}%".format)
+    cards["market_cap_display"] = format_or_na(cards["market_cap_value"], "₹{:,.2f} Cr")
+    cards["value_display"] = format_or_na(cards["value_traded"], "₹{:,.2f} Cr")
+    cards["volume_display"] = format_or_na(cards["volume"], "{:,.2f} L")
+    return cards
+
+# Build the card table of a snapshot into the shared store
+@st.cache_resource(max_entries=2)
+def read_card_table(signature):
+    return build_card_table(*read_snapshot_datasets(signature), read_market_cap_classes(signature[-1]))
+
+# Load the card table of the current snapshot
+def load_card_table():
+    return read_only_view(read_card_table(snapshot_signature()))
+
+# Universe grid sort key -> card table column
+SORT_COLUMNS = {
+    "% Change": "percent_change",
+    "Market Cap": "market_cap_value",
+    "Value Traded": "value_traded",
+    "P/E": "pe_ratio"
+}
+
+# Precompute the universe grid orderings
+def build_sort_orders(cards):
+    """Positions of the traded symbols in each sort order, keyed by (sort key, ascending); missing values sort last"""
+    traded = np.flatnonzero(cards["ltp"].notna().to_numpy())
+    orders = {}
+    for key, column in SORT_COLUMNS.items():
+        values = cards[column].to_numpy(float)[traded]
+        orders[(key, True)] = traded[np.argsort(values, kind='stable')]
+        orders[(key, False)] = traded[np.argsort(-values, kind='stable')]
+    for order in orders.values():
+        order.flags.writeable = False
+    return MappingProxyType(orders)
+
+# Precompute a snapshot's universe grid orderings into the shared store
+@st.cache_resource(max_entries=2)
+def read_sort_orders(signature):
+    return build_sort_orders(read_card_table(signature))
+
+# Load the universe grid orderings of the current snapshot
+def load_sort_orders():
+    return read_sort_orders(snapshot_signature())
+
+# Leaderboard -> (card table column, largest first, sign the value must have: 1, -1 or 0 for any)
+LEADERBOARDS = {
+    "Top Gainers": ("percent_change", True, 1),
+    "Top Losers": ("percent_change", False, -1),
+    "Most Active by Value": ("value_traded", True, 0),
+    "Most Active by Volume": ("volume", True, 0)
+}
+LEADERBOARD_SIZE = 10
+
+def top_positions(values, count, largest):
+    """Positions of the count largest (or smallest) values, best first, by partial selection; NaN is never picked"""
+    keys = -values if largest else values
+    candidates = np.flatnonzero(~np.isnan(keys))
+    if len(candidates) > count:
+        candidates = candidates[np.argpartition(keys[candidates], count - 1)[:count]]
+    return candidates[np.argsort(keys[candidates], kind='stable')]
+
+# Precompute every leaderboard overall and per market-cap bucket
+def build_leaderboards(cards, size=LEADERBOARD_SIZE):
+    """Card table positions of each board's leaders, keyed by (board, "All" or market-cap class)"""
+    traded = cards["ltp"].notna().to_numpy()
+    classes = cards["market_cap_class"].to_numpy()
+    buckets = {"All": traded}
+    buckets.update({cap: traded & (classes == cap) for cap in MARKET_CAP_CLASSES})
+    leaderboards = {}
+    for board, (column, largest, sign) in LEADERBOARDS.items():
+        values = cards[column].to_numpy(float)
+        eligible = np.sign(values) == sign if sign else np.ones(len(values), dtype=bool)
+        for bucket, members in buckets.items():
+            positions = np.flatnonzero(members & eligible)
+            leaders = positions[top_positions(values[positions], size, largest)]
+            leaders.flags.writeable = False
+            leaderboards[(board, bucket)] = leaders
+    return MappingProxyType(leaderboards)
+
+# Precompute a snapshot's leaderboards into the shared store
+@st.cache_resource(max_entries=2)
+def read_leaderboards(signature):
+    return build_leaderboards(read_card_table(signature))
+
+# Load the leaderboards of the current snapshot
+def load_leaderboards():
+    return read_leaderboards(snapshot_signature())
+
+# Distance from the 52-week high or low counted as "near" it
+BREADTH_BAND = 0.02
+
+# Summarize market breadth from the joined snapshot
+def build_market_breadth(cards, band=BREADTH_BAND):
+    """Advance/decline counts, shares of traded stocks near their 52-week high and low, and P/E quartiles per market-cap class"""
+    traded = cards[cards["ltp"].notna()]
+    change, ltp = traded["percent_change"].to_numpy(float), traded["ltp"].to_numpy(float)
+    high, low = traded["week_52_high"].to_numpy(float), traded["week_52_low"].to_numpy(float)
+    has_high, has_low = ~np.isnan(high), ~np.isnan(low)
+    # Only positive earnings give a meaningful P/E
+    pe = traded["pe_ratio"].where(traded["pe_ratio"] > 0)
+    pe_distribution = pe.groupby(traded["market_cap_class"]).describe()
+    pe_distribution = pe_distribution.reindex(list(MARKET_CAP_CLASSES))[["count", "25%", "50%", "75%", "mean"]]
+    return MappingProxyType({
+        "traded": len(traded),
+        "advances": int(np.count_nonzero(change > 0)),
+        "declines": int(np.count_nonzero(change < 0)),
+        "unchanged": int(np.count_nonzero(change == 0)),
+        "near_high_pct": np.count_nonzero(has_high & (ltp >= high * (1 - band))) / max(np.count_nonzero(has_high), 1) * 100,
+        "near_low_pct": np.count_nonzero(has_low & (ltp <= low * (1 + band))) / max(np.count_nonzero(has_low), 1) * 100,
+        "pe_distribution": read_only_view(pe_distribution)
+    })
+
+# Summarize a snapshot's market breadth into the shared store
+@st.cache_resource(max_entries=2)
+def read_market_breadth(signature):
+    return build_market_breadth(read_card_table(signature))
+
+# Load the market breadth of the current snapshot
+def load_market_breadth():
+    return read_market_breadth(snapshot_signature())
+
+# Build a snapshot's screener columns into the shared store
+@st.cache_resource(max_entries=2)
+def read_screen_columns(signature):
+    return build_screen_columns(read_card_table(signature))
+
+# Run a screen over one snapshot, caching results per filter combination
+@st.cache_resource(max_entries=256)
+def read_screen(signature, filters):
+    columns, traded = read_screen_columns(signature)
+    return screen(columns, traded, filters)
+
+def run_screen(filters):
+    """filters is a tuple of (field, operator, value); returns positions in the current card table"""
+    return read_screen(snapshot_signature(), filters)
@@ -0,0 +1,135 @@
+import pandas as pd
+import os
+import sqlite3
+import argparse
+from schemas import DATA_DIR, SCHEMAS, normalize_frame, read_csv_with_schema
+from history_store import MANIFEST, store_dir_for, read_store
+
+# Optional SQLite backend for the price history. Each history dataset is a
+# table keyed on (symbol, date) so a page reads one symbol's rows
+# through the primary key instead of loading the whole history.
+
+HISTORY_DATASETS = ["etf_daily", "etf_week", "etf_month", "index_daily", "index_week", "index_month"]
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def create_tables(connection):
+    """Create one WITHOUT ROWID table per history dataset, clustered on (symbol, date)"""
+    for name in HISTORY_DATASETS:
+        schema = SCHEMAS[name]
+        columns = []
+        for column in schema["usecols"]:
+            sql_type = "TEXT" if column in schema["text_columns"] else "REAL"
+            columns.append(f"{quote(column)} {sql_type}")
+        connection.execute(f"CREATE TABLE IF NOT EXISTS {name} ({', '.join(columns)}, "
+                           f"PRIMARY KEY ({quote(schema['symbol_column'])}, \"Date\")) WITHOUT ROWID")
+    connection.commit()
+
+def connect(db_path, read_only=False):
+    if read_only:
+        # sqlite only reports "unable to open database file" for a missing file
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"History database {db_path} not found; create it with history_db.py "
+                                    f"or ingest with --backend sqlite")
+        return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    connection = sqlite3.connect(db_path, timeout=60)
+    create_tables(connection)
+    return connection
+
+def insert_frame(connection, name, df):
+    """Insert typed registry rows, skipping (symbol, date) pairs already present; returns the count"""
+    schema = SCHEMAS[name]
+    df = df[schema["usecols"]].copy()
+    df[schema["symbol_column"]] = df[schema["symbol_column"]].str.strip().str.upper()
+    df["Date"] = df["Date"].dt.strftime('%Y-%m-%d')
+    df = df.astype(object).where(df.notna(), None)
+    placeholders = ", ".join("?" for _ in schema["usecols"])
+    before = connection.total_changes
+    connection.executemany(f"INSERT OR IGNORE INTO {name} VALUES ({placeholders})", df.itertuples(index=False, name=None))
+    connection.commit()
+    return connection.total_changes - before
+
+def insert_raw_rows(db_path, name, raw_df):
+    """Ingest rows read with dtype=str straight into the database; returns the count added"""
+    connection = connect(db_path)
+    try:
+        return insert_frame(connection, name, normalize_frame(raw_df, SCHEMAS[name]))
+    finally:
+        connection.close()
+
+def query_symbol(db_path, name, symbol):
+    """One symbol's OHLCV rows through the primary key"""
+    schema = SCHEMAS[name]
+    columns = [column for column in schema["ohlcv_columns"] if column]
+    sql = (f"SELECT \"Date\", {', '.join(quote(column) for column in columns)} FROM {name} "
+           f"WHERE {quote(schema['symbol_column'])} = ? ORDER BY \"Date\"")
+    connection = connect(db_path, read_only=True)
+    try:
+        df = pd.read_sql_query(sql, connection, params=(symbol,))
+    finally:
+        connection.close()
+    df["Date"] = pd.to_datetime(df["Date"], format='%Y-%m-%d')
+    return df
+
+def query_dataset(db_path, name):
+    """Every symbol's dated OHLCV rows of a dataset, for analytics over the whole universe"""
+    schema = SCHEMAS[name]
+    columns = [schema["symbol_column"], "Date"] + [column for column in schema["ohlcv_columns"] if column]
+    connection = connect(db_path, read_only=True)
+    try:
+        df = pd.read_sql_query(f"SELECT {', '.join(quote(column) for column in columns)} FROM {name}", connection)
+    finally:
+        connection.close()
+    df["Date"] = pd.to_datetime(df["Date"], format='%Y-%m-%d')
+    return df
+
+def database_revision(db_path):
+    """Identify a database revision by the modification time and size of its files"""
+    parts = []
+    for path in (db_path, db_path + "-wal"):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            parts.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+    if not parts:
+        raise FileNotFoundError(f"History database {db_path} not found; create it with history_db.py "
+                                f"or ingest with --backend sqlite")
+    return f"{os.path.basename(db_path)}:{':'.join(parts)}".encode()
+
+def list_datasets(db_path):
+    """History datasets that have at least one row in the database"""
+    connection = connect(db_path, read_only=True)
+    try:
+        tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        return [name for name in HISTORY_DATASETS
+                if name in tables and connection.execute(f"SELECT EXISTS (SELECT 1 FROM {name})").fetchone()[0]]
+    finally:
+        connection.close()
+
+def import_datasets(db_path, data_dir):
+    """Load the history files (or their segment stores) into the database"""
+    connection = connect(db_path)
+    try:
+        for name in HISTORY_DATASETS:
+            csv_path = os.path.join(data_dir, SCHEMAS[name]["filename"])
+            if os.path.exists(os.path.join(store_dir_for(csv_path), MANIFEST)):
+                df = read_store(store_dir_for(csv_path), SCHEMAS[name])
+            elif os.path.exists(csv_path):
+                df = read_csv_with_schema(csv_path, SCHEMAS[name])
+            else:
+                continue
+            print(f"{name}: {insert_frame(connection, name, df)} new rows of {len(df)}")
+    finally:
+        connection.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the history files into the SQLite backend")
+    parser.add_argument("--data-dir", default=DATA_DIR,
+                        help="directory holding the history files (default: STOCKS_DATA_DIR or the script directory)")
+    parser.add_argument("--db", default=os.environ.get("STOCKS_HISTORY_DB"),
+                        help="database file (default: STOCKS_HISTORY_DB or history.sqlite in the data directory)")
+    args = parser.parse_args()
+    import_datasets(args.db or os.path.join(args.data_dir, "history.sqlite"), args.data_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import pandas as pd
+import os
+import json
+import sqlite3
+import threading
+from schemas import SCHEMAS, read_csv_with_schema, empty_frame, normalize_header
+
+# A history store replaces a single growing CSV (e.g. etf_month.csv) with a
+# directory (etf_month/) of immutable, month-partitioned segment CSVs and a
+# manifest listing the live segments. Files are written under a temporary
+# name and renamed into place, and a segment only becomes visible once the
+# manifest naming it has been replaced, so a crash never truncates history.
+
+MANIFEST = "manifest.json"
+KEY_INDEX = "keys.sqlite"
+
+# Date format of the bhavcopy "Date" column
+DATE_FORMAT = SCHEMAS["etf_week"]["date_formats"]["Date"]
+
+# Segments smaller than this are merged by compaction
+COMPACT_MIN_ROWS = 50000
+
+def store_dir_for(target_file):
+    """Store directory of a history file, e.g. etf_month.csv -> etf_month/"""
+    return os.path.splitext(target_file)[0]
+
+def write_atomic(path, write):
+    """Write a file under a temporary name and rename it into place"""
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def read_manifest(store_dir):
+    path = os.path.join(store_dir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def write_manifest(store_dir, manifest):
+    write_atomic(os.path.join(store_dir, MANIFEST), lambda f: json.dump(manifest, f, indent=1))
+
+def normalize_columns(df):
+    """Rename padded download headers to their registry names so every segment shares one header"""
+    return df.rename(columns=normalize_header)
+
+def row_dates(df):
+    return pd.to_datetime(df["Date"].str.strip(), format=DATE_FORMAT)
+
+def row_keys(df):
+    """(symbol, yyyymmdd) key of each row"""
+    symbols = df["Symbol"].str.strip().str.upper()
+    dates = row_dates(df)
+    return list(zip(symbols, (dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day).tolist()))
+
+def write_segments(store_dir, manifest, df):
+    """Write rows as new immutable segments, one per month, and return their manifest entries"""
+    dates = row_dates(df)
+    entries = []
+    for partition, rows in df.groupby(dates.dt.strftime('%Y-%m'), sort=True):
+        filename = f"{partition}-{manifest['next_id']:06d}.csv"
+        manifest["next_id"] += 1
+        write_atomic(os.path.join(store_dir, filename), lambda f: rows.to_csv(f, index=False))
+        partition_dates = dates.loc[rows.index]
+        entries.append({"file": filename, "partition": partition, "rows": len(rows),
+                        "start": partition_dates.min().strftime('%Y-%m-%d'),
+                        "end": partition_dates.max().strftime('%Y-%m-%d')})
+    return entries
+
+def init_store(target_file):
+    """Create the store of a history file, seeding it from the legacy CSV once"""
+    store_dir = store_dir_for(target_file)
+    if read_manifest(store_dir) is not None:
+        return store_dir
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = {"next_id": 1, "segments": []}
+    if os.path.exists(target_file):
+        legacy = normalize_columns(pd.read_csv(target_file, dtype=str))
+        manifest["segments"] = write_segments(store_dir, manifest, legacy)
+    write_manifest(store_dir, manifest)
+    return store_dir
+
+def open_writer(store_dir):
+    """Open the store's key index, which doubles as the cross-process writer lock"""
+    connection = sqlite3.connect(os.path.join(store_dir, KEY_INDEX), timeout=60)
+    connection.execute("CREATE TABLE IF NOT EXISTS keys (symbol TEXT NOT NULL, date INTEGER NOT NULL, "
+                       "PRIMARY KEY (symbol, date)) WITHOUT ROWID")
+    connection.execute("CREATE TABLE IF NOT EXISTS indexed_segments (file TEXT PRIMARY KEY)")
+    connection.commit()
+    return connection
+
+def begin_write(connection, store_dir):
+    """Take the writer lock and bring the key index in step with the manifest"""
+    connection.execute("BEGIN IMMEDIATE")
+    manifest = read_manifest(store_dir)
+    live = {entry["file"] for entry in manifest["segments"]}
+    indexed = {row[0] for row in connection.execute("SELECT file FROM indexed_segments")}
+    # Segments published by a writer that crashed before committing its keys
+    for filename in sorted(live - indexed):
+        segment = normalize_columns(pd.read_csv(os.path.join(store_dir, filename), dtype=str,
+                                                usecols=lambda column: normalize_header(column) in ("Symbol", "Date")))
+        connection.executemany("INSERT OR IGNORE INTO keys VALUES (?, ?)", row_keys(segment))
+        connection.execute("INSERT INTO indexed_segments VALUES (?)", (filename,))
+    connection.executemany("DELETE FROM indexed_segments WHERE file = ?", [(name,) for name in indexed - live])
+    return manifest
+
+def claim_new_rows(connection, df):
+    """Insert the keys of incoming rows and return a mask of the rows not seen before"""
+    is_new = [connection.execute("INSERT OR IGNORE INTO keys VALUES (?, ?)", key).rowcount == 1
+              for key in row_keys(df)]
+    return pd.Series(is_new, index=df.index)
+
+def add_rows(connection, store_dir, df):
+    """Publish the rows whose (symbol, date) is not in the store yet; returns the count"""
+    try:
+        manifest = begin_write(connection, store_dir)
+        df = normalize_columns(df)
+        new_data = df[claim_new_rows(connection, df)]
+        if len(new_data) > 0:
+            entries = write_segments(store_dir, manifest, new_data)
+            manifest["segments"].extend(entries)
+            write_manifest(store_dir, manifest)
+            connection.executemany("INSERT INTO indexed_segments VALUES (?)", [(entry["file"],) for entry in entries])
+        connection.commit()
+        return len(new_data)
+    except BaseException:
+        connection.rollback()
+        raise
+
+def compact_store(store_dir, min_rows=COMPACT_MIN_ROWS):
+    """Merge the small segments of each month into one segment and drop unreferenced files"""
+    connection = open_writer(store_dir)
+    try:
+        manifest = begin_write(connection, store_dir)
+        by_partition = {}
+        for entry in manifest["segments"]:
+            if entry["rows"] < min_rows:
+                by_partition.setdefault(entry["partition"], []).append(entry)
+
+        merged_files = set()
+        for partition, entries in by_partition.items():
+            if len(entries) < 2:
+                continue
+            rows = pd.concat([normalize_columns(pd.read_csv(os.path.join(store_dir, entry["file"]), dtype=str))
+                              for entry in entries], ignore_index=True)
+            merged = write_segments(store_dir, manifest, rows)
+            replaced = {entry["file"] for entry in entries}
+            position = manifest["segments"].index(entries[0])
+            segments = [entry for entry in manifest["segments"] if entry["file"] not in replaced]
+            manifest["segments"] = segments[:position] + merged + segments[position:]
+            connection.executemany("INSERT INTO indexed_segments VALUES (?)", [(entry["file"],) for entry in merged])
+            connection.executemany("DELETE FROM indexed_segments WHERE file = ?", [(name,) for name in replaced])
+            merged_files |= replaced
+
+        if merged_files:
+            write_manifest(store_dir, manifest)
+
+        # Once the manifest is replaced the merged segments are unreachable.
+        # Sweep them, and files left by crashed writers, while still holding
+        # the writer lock so no unpublished segment is being written.
+        live = {entry["file"] for entry in manifest["segments"]}
+        for filename in os.listdir(store_dir):
+            if filename.endswith(".csv") and filename not in live:
+                os.remove(os.path.join(store_dir, filename))
+        connection.commit()
+        return len(merged_files)
+    except BaseException:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+def start_background_compaction(store_dir, min_rows=COMPACT_MIN_ROWS):
+    """Compact a store on a background thread; the process waits for it before exiting"""
+    thread = threading.Thread(target=compact_store, args=(store_dir, min_rows), name="history-compaction")
+    thread.start()
+    return thread
+
+def read_store(store_dir, schema):
+    """Read every live segment through a schema"""
+    for attempt in range(2):
+        manifest = read_manifest(store_dir)
+        try:
+            frames = [read_csv_with_schema(os.path.join(store_dir, entry["file"]), schema)
+                      for entry in manifest["segments"]]
+            break
+        except FileNotFoundError:
+            # A compaction replaced the manifest while we were reading it
+            if attempt:
+                raise
+    if not frames:
+        return empty_frame(schema)
+    return pd.concat(frames, ignore_index=True)
@@ -1,8 +1,11 @@
-import pandas as pd
 import streamlit as st
+from urllib.parse import quote
+from html import escape
 import plotly.express as px
-import os
-import random
+from sectors import stocks, sector_symbols
+from data_loader import (load_dataset, load_card_table, load_market_cap_classes, load_sort_orders,
+                         load_leaderboards, load_market_breadth, MARKET_CAP_CLASSES, SORT_COLUMNS,
+                         LEADERBOARDS, BREADTH_BAND)
 
 # Set page configuration
 st.set_page_config(
@@ -223,43 +226,45 @@ st.markdown("""
         transform: translateY(-2px);
         box-shadow: 0 6px 12px rgba(0, 0, 0, 0.1);
     }
+
+    /* Card Grid */
+    .breadth-grid {
+        grid-template-columns: repeat(5, 1fr);
+        margin-bottom: 1.25rem;
+    }
+
+    .card-grid {
+        display: grid;
+        grid-template-columns: repeat(2, minmax(0, 1fr));
+        column-gap: 1rem;
+    }
+
+    .details-link {
+        display: block;
+        margin-top: 1.25rem;
+        padding: 0.85rem;
+        border-radius: 10px;
+        background: var(--primary);
+        color: white !important;
+        text-align: center;
+        text-decoration: none !important;
+        font-weight: 600;
+        text-transform: uppercase;
+        letter-spacing: 0.05em;
+        transition: all 0.2s ease;
+    }
+
+    .details-link:hover {
+        background: var(--primary-light);
+        transform: translateY(-2px);
+        box-shadow: 0 6px 12px rgba(0, 0, 0, 0.1);
+    }
 </style>
 """, unsafe_allow_html=True)
 
-# Define stock data with updated stocks
-stocks = {
-    "Sector": {
-        "Tech": [
-            {"symbol": "INFY", "company": "Infosys Ltd.", "description": "Infosys is a global leader in next-generation digital services and consulting."},
-            {"symbol": "TCS", "company": "Tata Consultancy Services Ltd.", "description": "TCS is a leading global IT services, consulting, and business solutions organization."},
-            {"symbol": "COFORGE", "company": "Coforge Ltd.", "description": "Coforge is a global IT solutions organization providing digital services."},
-            {"symbol": "MASTEK", "company": "Mastek Ltd.", "description": "Mastek provides enterprise technology solutions and digital transformation services."}
-        ],
-        "Finance": [
-            {"symbol": "HDFCBANK", "company": "HDFC Bank Ltd.", "description": "HDFC Bank is one of India's premier banking institutions."},
-            {"symbol": "SBIN", "company": "State Bank of India", "description": "SBI is India's largest public sector bank providing comprehensive banking services."},
-            {"symbol": "IDFCFIRSTB", "company": "IDFC First Bank Ltd.", "description": "IDFC First Bank offers banking and financial services with a focus on retail and business banking."},
-            {"symbol": "DCBBANK", "company": "DCB Bank Ltd.", "description": "DCB Bank provides banking services to individuals and businesses in India."}
-        ],
-        "Energy": [
-            {"symbol": "TATAPOWER", "company": "Tata Power Company Ltd.", "description": "Tata Power is one of India's largest integrated power companies."},
-            {"symbol": "ADANIGREEN", "company": "Adani Green Energy Ltd.", "description": "Adani Green is a leading renewable energy company in India."},
-            {"symbol": "NHPC", "company": "NHPC Ltd.", "description": "NHPC is a major hydropower generation company in India."},
-            {"symbol": "RELINFRA", "company": "Reliance Infrastructure Ltd.", "description": "Reliance Infra is involved in power generation, transmission, and distribution."}
-        ],
-        "Consumer": [
-            {"symbol": "HINDUNILVR", "company": "Hindustan Unilever Ltd.", "description": "Hindustan Unilever is a leading consumer goods company in India."},
-            {"symbol": "ITC", "company": "ITC Ltd.", "description": "ITC is a diversified conglomerate with a strong presence in FMCG."},
-            {"symbol": "BAJAJELEC", "company": "Bajaj Electricals Ltd.", "description": "Bajaj Electricals is a consumer electrical equipment manufacturing company."},
-            {"symbol": "VOLTAS", "company": "Voltas Ltd.", "description": "Voltas is a leading air conditioning and engineering services company."}
-        ]
-    },
-    "Market-cap": {
-        "Large-cap": [],
-        "Mid-cap": [],
-        "Small-cap": []
-    }
-}
+# Company names of the curated stocks; the universe grid shows the rest by symbol only
+companies = {stock_info["symbol"]: stock_info["company"]
+             for sector in stocks["Sector"].values() for stock_info in sector}
 
 # Define indices data
 indices = {
@@ -268,94 +273,65 @@ indices = {
     "NIFTY BANK": {"description": "NIFTY BANK tracks the performance of the most liquid and large capitalized banking stocks."}
 }
 
-# Load data function
-@st.cache_data
-def load_data():
-    base_path = r"C:\Users\Srujan KV\Desktop\Srujan Zenshastra\WEEK 7\Indian stockk dashboard"
-    weekly_data = pd.read_csv(os.path.join(base_path, 'etf_week.csv'))
-    weekly_data.columns = weekly_data.columns.str.strip()
-    weekly_data = weekly_data[['Date', 'Symbol', 'Close Price']]
-    weekly_data['Date'] = pd.to_datetime(weekly_data['Date'])
-    weekly_data['Close Price'] = weekly_data['Close Price'].astype(str).str.replace(',', '').astype(float)
-
-    monthly_data = pd.read_csv(os.path.join(base_path, 'etf_month.csv'))
-    monthly_data.columns = monthly_data.columns.str.strip()
-    monthly_data = monthly_data[['Date', 'Symbol', 'Close Price']]
-    monthly_data['Date'] = pd.to_datetime(monthly_data['Date'])
-    monthly_data['Close Price'] = monthly_data['Close Price'].astype(str).str.replace(',', '').astype(float)
-
-    high_low_data = pd.read_csv(os.path.join(base_path, '52W-high-low.csv'))
-    high_low_data.columns = high_low_data.columns.str.strip()
-
-    pe_data = pd.read_csv(os.path.join(base_path, 'PE.csv'))
-    pe_data.columns = pe_data.columns.str.strip()
-
-    traded_data = pd.read_csv(os.path.join(base_path, 'StocksTraded.csv'))
-    traded_data.columns = traded_data.columns.str.strip()
-
-    index_data = pd.read_csv(os.path.join(base_path, 'index_data.csv'))
-    index_data.columns = [col.strip() for col in index_data.columns]
-
-    return weekly_data, monthly_data, high_low_data, pe_data, traded_data, index_data
-
+# Load data
 try:
-    weekly_data, monthly_data, high_low_data, pe_data, traded_data, index_data = load_data()
+    index_data = load_dataset("index_data")
+    market_cap_classes = load_market_cap_classes()
+    card_table = load_card_table()
+    sort_orders = load_sort_orders()
+    leaderboards = load_leaderboards()
+    market_breadth = load_market_breadth()
 except FileNotFoundError as e:
     st.error(f"Error: {e}. Please ensure all CSV files are present in the specified directory.")
     st.stop()
 
-# Get stock data function
-def get_stock_data(symbol):
-    symbol = symbol.strip().upper()
-    weekly_perf = weekly_data[weekly_data['Symbol'].str.strip().str.upper() == symbol].sort_values('Date')
-    monthly_perf = monthly_data[monthly_data['Symbol'].str.strip().str.upper() == symbol].sort_values('Date')
-    
-    try:
-        high_low = high_low_data[high_low_data['SYMBOL'].str.strip().str.upper() == symbol].iloc[0]
-        week_52_high = float(high_low['Adjusted 52_Week_High'])
-        week_52_low = float(high_low['Adjusted 52_Week_Low'])
-    except IndexError:
-        week_52_high = "N/A"
-        week_52_low = "N/A"
-    
-    try:
-        pe = float(pe_data[pe_data['SYMBOL'].str.strip().str.upper() == symbol].iloc[0]['ADJUSTED P/E'])
-    except IndexError:
-        pe = "N/A"
-    
-    yield_value = round(random.uniform(1, 5), 2)
-    
-    try:
-        traded = traded_data[traded_data['Symbol'].str.strip().str.upper() == symbol].iloc[0]
-        ltp = float(traded['LTP'])
-        percent_change = float(traded['%chng'])
-        market_cap_value = float(traded['Mkt Cap (₹ Crores)'])
-        market_cap = f"₹{market_cap_value:,.2f} Cr"
-        
-        if market_cap_value > 50000:
-            market_cap_class = "Large-cap"
-        elif 16000 <= market_cap_value <= 50000:
-            market_cap_class = "Mid-cap"
-        else:
-            market_cap_class = "Small-cap"
-    except IndexError:
-        ltp = "N/A"
-        percent_change = "N/A"
-        market_cap = "N/A"
-        market_cap_class = "N/A"
-    
-    return {
-        'weekly_performance': weekly_perf,
-        'monthly_performance': monthly_perf,
-        '52_week_high': week_52_high,
-        '52_week_low': week_52_low,
-        'pe_ratio': pe,
-        'yield': yield_value,
-        'market_cap': market_cap,
-        'market_cap_class': market_cap_class,
-        'ltp': ltp,
-        'percent_change': percent_change
-    }
+# Card rows of the given symbols in order, N/A for symbols without snapshot data
+def select_cards(symbols):
+    return card_table.reindex([symbol.strip().upper() for symbol in symbols], fill_value="N/A")
+
+# One stock card; "View Details" links back here with the symbol as a query param
+CARD_TEMPLATE = """<div class="stock-card">
+    <div class="stock-symbol">{symbol}</div>
+    <div class="stock-company">{company}</div>
+    <div class="stock-price">{price}</div>
+    <div class="price-change {change_class}">
+        {triangle} {change}
+    </div>
+    <div class="metrics-container">
+        <div class="metric">
+            <div class="metric-label">P/E</div>
+            <div class="metric-value">{pe}</div>
+        </div>
+        <div class="metric">
+            <div class="metric-label">Yield</div>
+            <div class="metric-value">{dividend_yield}</div>
+        </div>
+        <div class="metric">
+            <div class="metric-label">{last_label}</div>
+            <div class="metric-value">{last_value}</div>
+        </div>
+    </div>
+    <a class="details-link" href="?symbol={link}" target="_self">View Details</a>
+</div>"""
+
+# Render card table rows as one HTML payload
+def render_card_grid(cards, last_label, last_column):
+    html = "".join(
+        CARD_TEMPLATE.format(symbol=escape(card.Index), company=escape(companies.get(card.Index, "")),
+                             price=card.price_display, change_class=card.change_class,
+                             triangle=card.triangle, change=card.change_display, pe=card.pe_display,
+                             dividend_yield=card.yield_display, last_label=last_label,
+                             last_value=getattr(card, last_column), link=quote(card.Index))
+        for card in cards.itertuples())
+    st.markdown(f'<div class="card-grid">{html}</div>', unsafe_allow_html=True)
+
+# Leaderboard -> (label, card table column) of the card's last metric
+LEADERBOARD_METRICS = {
+    "Top Gainers": ("Market Cap", "market_cap_display"),
+    "Top Losers": ("Market Cap", "market_cap_display"),
+    "Most Active by Value": ("Value Traded", "value_display"),
+    "Most Active by Volume": ("Volume", "volume_display")
+}
 
 # Get index data function
 def get_index_data(index_name):
@@ -396,12 +372,12 @@ def get_index_data(index_name):
             }
 
         index_row = index_data[index_data['SYMBOL'].str.strip() == index_name].iloc[0]
-        ltp = float(str(index_row['LTP']).replace(',', ''))
-        change = float(str(index_row['CHNG']).replace(',', ''))
-        percent_change = float(str(index_row['%CHNG']).replace(',', ''))
-        week_52_high = float(str(index_row['52W H']).replace(',', ''))
-        week_52_low = float(str(index_row['52W L']).replace(',', ''))
-        value = float(str(index_row['VALUE (₹ Crores)']).replace(',', ''))
+        ltp = float(index_row['LTP'])
+        change = float(index_row['CHNG'])
+        percent_change = float(index_row['%CHNG'])
+        week_52_high = float(index_row['52W H'])
+        week_52_low = float(index_row['52W L'])
+        value = float(index_row['VALUE (₹ Crores)'])
         return {
             'ltp': ltp,
             'change': change,
@@ -421,29 +397,13 @@ def get_index_data(index_name):
             'value': "N/A"
         }
 
-# Function to populate market-cap categories dynamically
-def populate_market_cap_stocks():
-    stocks["Market-cap"]["Large-cap"].clear()
-    stocks["Market-cap"]["Mid-cap"].clear()
-    stocks["Market-cap"]["Small-cap"].clear()
-    
-    all_stocks = []
-    for sector in stocks["Sector"].values():
-        all_stocks.extend(sector)
-    
-    for stock_info in all_stocks:
-        symbol = stock_info["symbol"]
-        stock_data = get_stock_data(symbol)
-        market_cap_class = stock_data['market_cap_class']
-        
-        if market_cap_class == "Large-cap":
-            stocks["Market-cap"]["Large-cap"].append(stock_info)
-        elif market_cap_class == "Mid-cap":
-            stocks["Market-cap"]["Mid-cap"].append(stock_info)
-        elif market_cap_class == "Small-cap":
-            stocks["Market-cap"]["Small-cap"].append(stock_info)
-
 def main():
+    # Card "View Details" links arrive as a query param
+    if "symbol" in st.query_params:
+        st.session_state['selected_symbol'] = st.query_params["symbol"]
+        del st.query_params["symbol"]
+        st.switch_page("pages/stock_details.py")
+    
     # Dashboard Header
     st.markdown("""
     <div class="dashboard-header">
@@ -466,8 +426,8 @@ def main():
         
         market_cap_filter = st.multiselect(
             "Market Cap",
-            options=list(stocks["Market-cap"].keys()),
-            default=list(stocks["Market-cap"].keys())
+            options=list(MARKET_CAP_CLASSES),
+            default=list(MARKET_CAP_CLASSES)
         )
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -503,97 +463,77 @@ def main():
                 st.session_state['selected_index'] = index_name
                 st.switch_page("pages/index_details.py")
 
+    # Market breadth, summarized once per snapshot
+    band = f"{BREADTH_BAND:.0%}"
+    breadth = [
+        ("Advances", f"{market_breadth['advances']:,}"),
+        ("Declines", f"{market_breadth['declines']:,}"),
+        ("Unchanged", f"{market_breadth['unchanged']:,}"),
+        (f"Within {band} of 52W High", f"{market_breadth['near_high_pct']:.1f}%"),
+        (f"Within {band} of 52W Low", f"{market_breadth['near_low_pct']:.1f}%")
+    ]
+    metrics = "".join(f'<div class="metric"><div class="metric-label">{label}</div>'
+                      f'<div class="metric-value">{value}</div></div>' for label, value in breadth)
+    st.markdown(f'<div class="metrics-container breadth-grid">{metrics}</div>', unsafe_allow_html=True)
+    
+    with st.expander("P/E distribution by market cap"):
+        pe_distribution = market_breadth["pe_distribution"].rename(
+            columns={"count": "Stocks", "25%": "P25", "50%": "Median", "75%": "P75", "mean": "Mean"})
+        st.dataframe(pe_distribution, width='stretch', column_config={"Stocks": st.column_config.NumberColumn(format="%d")})
+        st.caption(f"Across {market_breadth['traded']:,} traded stocks; loss-making companies are excluded.")
+
     # Main Content Tabs
-    tab1, tab2 = st.tabs(["Sector-wise", "Market-cap wise"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Sector-wise", "Market-cap wise", "All Stocks", "Leaderboards"])
     
     with tab1:
         st.markdown('<div class="section-header">Sector-wise Stocks</div>', unsafe_allow_html=True)
         for sector in sector_filter:
             st.subheader(sector)
-            cols = st.columns(2)
-            for i, stock_info in enumerate(stocks["Sector"][sector]):
-                symbol = stock_info["symbol"]
-                company = stock_info["company"]
-                stock_data = get_stock_data(symbol)
-                
-                with cols[i % 2]:
-                    change_class = "positive" if stock_data['percent_change'] > 0 else "negative"
-                    triangle = "▲" if stock_data['percent_change'] > 0 else "▼"
-                    
-                    st.markdown(f"""
-                    <div class="stock-card">
-                        <div class="stock-symbol">{symbol}</div>
-                        <div class="stock-company">{company}</div>
-                        <div class="stock-price">₹{stock_data['ltp']:,.2f}</div>
-                        <div class="price-change {change_class}">
-                            {triangle} {stock_data['percent_change']:+.2f}%
-                        </div>
-                        <div class="metrics-container">
-                            <div class="metric">
-                                <div class="metric-label">P/E</div>
-                                <div class="metric-value">{stock_data['pe_ratio']}</div>
-                            </div>
-                            <div class="metric">
-                                <div class="metric-label">Yield</div>
-                                <div class="metric-value">{stock_data['yield']}%</div>
-                            </div>
-                            <div class="metric">
-                                <div class="metric-label">Category</div>
-                                <div class="metric-value">{stock_data['market_cap_class']}</div>
-                            </div>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    if st.button("View Details", key=f"btn_{symbol}_{sector}"):
-                        st.session_state['selected_symbol'] = symbol
-                        st.switch_page("pages/stock_details.py")
+            sector_cards = select_cards(sector_symbols(sector))
+            render_card_grid(sector_cards, "Category", "market_cap_class")
     
     with tab2:
         st.markdown('<div class="section-header">Market-cap wise Stocks</div>', unsafe_allow_html=True)
-        populate_market_cap_stocks()
+        all_stocks = [stock_info for sector in stocks["Sector"].values() for stock_info in sector]
         
         for cap in market_cap_filter:
             st.subheader(cap)
-            if stocks["Market-cap"][cap]:
-                cols = st.columns(2)
-                for i, stock_info in enumerate(stocks["Market-cap"][cap]):
-                    symbol = stock_info["symbol"]
-                    company = stock_info["company"]
-                    stock_data = get_stock_data(symbol)
-                    
-                    with cols[i % 2]:
-                        change_class = "positive" if stock_data['percent_change'] > 0 else "negative"
-                        triangle = "▲" if stock_data['percent_change'] > 0 else "▼"
-                        
-                        st.markdown(f"""
-                        <div class="stock-card">
-                            <div class="stock-symbol">{symbol}</div>
-                            <div class="stock-company">{company}</div>
-                            <div class="stock-price">₹{stock_data['ltp']:,.2f}</div>
-                            <div class="price-change {change_class}">
-                                {triangle} {stock_data['percent_change']:+.2f}%
-                            </div>
-                            <div class="metrics-container">
-                                <div class="metric">
-                                    <div class="metric-label">P/E</div>
-                                    <div class="metric-value">{stock_data['pe_ratio']}</div>
-                                </div>
-                                <div class="metric">
-                                    <div class="metric-label">Yield</div>
-                                    <div class="metric-value">{stock_data['yield']}%</div>
-                                </div>
-                                <div class="metric">
-                                    <div class="metric-label">Market Cap</div>
-                                    <div class="metric-value">{stock_data['market_cap']}</div>
-                                </div>
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        if st.button("View Details", key=f"btn_cap_{symbol}_{cap}"):
-                            st.session_state['selected_symbol'] = symbol
-                            st.switch_page("pages/stock_details.py")
+            # Buckets are precomputed once per snapshot for the whole universe
+            cap_stocks = [stock_info for stock_info in all_stocks
+                          if market_cap_classes.get(stock_info["symbol"]) == cap]
+            if cap_stocks:
+                cap_cards = select_cards([stock_info["symbol"] for stock_info in cap_stocks])
+                render_card_grid(cap_cards, "Market Cap", "market_cap_display")
             else:
                 st.info(f"No stocks available in {cap} category.")
+    
+    with tab3:
+        st.markdown('<div class="section-header">All Listed Stocks</div>', unsafe_allow_html=True)
+        controls = st.columns([2, 1, 1, 1])
+        sort_key = controls[0].selectbox("Sort by", list(SORT_COLUMNS), key="universe_sort")
+        ascending = controls[1].radio("Order", ["Descending", "Ascending"], key="universe_order") == "Ascending"
+        page_size = controls[2].selectbox("Per page", [20, 50, 100], key="universe_page_size")
+        
+        # Sorting is a lookup of a precomputed permutation; only the visible page is materialized
+        order = sort_orders[(sort_key, ascending)]
+        page_count = max(1, -(-len(order) // page_size))
+        page = controls[3].number_input("Page", min_value=1, max_value=page_count, value=1, key="universe_page")
+        start = (page - 1) * page_size
+        st.caption(f"Showing {start + 1}-{min(start + page_size, len(order))} of {len(order)} stocks")
+        render_card_grid(card_table.iloc[order[start:start + page_size]], "Market Cap", "market_cap_display")
+    
+    with tab4:
+        st.markdown('<div class="section-header">Market Leaderboards</div>', unsafe_allow_html=True)
+        bucket = st.radio("Market cap", ["All"] + list(MARKET_CAP_CLASSES), horizontal=True, key="leaderboard_bucket")
+        
+        # Leaders are selected once per snapshot for every board and bucket
+        for board in LEADERBOARDS:
+            st.subheader(board)
+            leaders = leaderboards[(board, bucket)]
+            if len(leaders):
+                render_card_grid(card_table.iloc[leaders], *LEADERBOARD_METRICS[board])
+            else:
+                st.info(f"No {bucket.lower()} stocks qualify.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Indicators are computed for every symbol at once over a price frame with
+# columns _key (normalized symbol), Date, close, high and low, sorted by
+# _key and Date. Rolling indicators only look back a fixed window, and the
+# exponential ones are recursive, so after an append-only ingest each
+# symbol's new rows are computed from a short tail of its old rows, with
+# the recursions seeded from the stored state.
+
+SMA_WINDOWS = (20, 50)
+EMA_SPANS = (12, 26)
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+RSI_PERIOD = 14
+BOLLINGER_WINDOW, BOLLINGER_WIDTH = 20, 2
+ATR_PERIOD = 14
+
+# Old rows a symbol's tail needs so every rolling window of a new row is full
+LOOKBACK = max(SMA_WINDOWS + (BOLLINGER_WINDOW,)) - 1
+
+# Exponential state carried over between runs
+STATE_COLUMNS = ["ema_12", "ema_26", "macd_signal", "avg_gain", "avg_loss", "atr_14"]
+
+def group_positions(codes):
+    """Group number of each row of key-sorted integer key codes, and its position within the group"""
+    new_group = np.r_[True, codes[1:] != codes[:-1]] if len(codes) else np.zeros(0, dtype=bool)
+    group = np.cumsum(new_group) - 1
+    return group, np.arange(len(codes)) - np.flatnonzero(new_group)[group]
+
+def rolling(values, position, window, statistic):
+    """Statistic of each row's trailing window within its symbol; NaN until the window is full"""
+    result = np.full(len(values), np.nan)
+    if len(values) >= window:
+        result[window - 1:] = statistic(sliding_window_view(values, window), axis=1)
+    result[position < window - 1] = np.nan
+    return result
+
+def exponential(values, group, position, alpha, seeds=None):
+    """Per-symbol y[t] = alpha * x[t] + (1 - alpha) * y[t-1], starting at the first input.
+    A missing input carries the average forward; a seed replaces the input of its row."""
+    if seeds is not None:
+        values = np.where(np.isnan(seeds), values, seeds)
+    if len(values) == 0:
+        return np.empty(0)
+    # One step per trading day, vectorized across symbols
+    panel = np.full((group[-1] + 1, position.max() + 1), np.nan)
+    panel[group, position] = values
+    average = panel[:, 0]
+    for day in range(1, panel.shape[1]):
+        inputs = panel[:, day]
+        average = np.where(np.isnan(average), inputs,
+                           np.where(np.isnan(inputs), average, alpha * inputs + (1 - alpha) * average))
+        panel[:, day] = average
+    return panel[group, position]
+
+# Compute every indicator in one pass over all symbols
+def compute_indicators(prices, seeds=None):
+    """Indicators of all symbols; seeds (aligned to prices) hold stored state on the rows to continue from"""
+    group, position = group_positions(pd.factorize(prices["_key"])[0])
+    close, high, low = (prices[column].to_numpy(float) for column in ["close", "high", "low"])
+    seed = lambda column: None if seeds is None else seeds[column].to_numpy(float)
+    result = {"_key": prices["_key"], "Date": prices["Date"]}
+
+    for window in SMA_WINDOWS:
+        result[f"sma_{window}"] = rolling(close, position, window, np.mean)
+    for span in EMA_SPANS:
+        result[f"ema_{span}"] = exponential(close, group, position, 2 / (span + 1), seed(f"ema_{span}"))
+
+    result["macd"] = result[f"ema_{MACD_FAST}"] - result[f"ema_{MACD_SLOW}"]
+    result["macd_signal"] = exponential(result["macd"], group, position, 2 / (MACD_SIGNAL + 1), seed("macd_signal"))
+    result["macd_hist"] = result["macd"] - result["macd_signal"]
+
+    # Wilder's RSI; a symbol's first row has no previous close
+    previous_close = np.r_[np.nan, close[:-1]]
+    previous_close[position == 0] = np.nan
+    change = close - previous_close
+    result["avg_gain"] = exponential(np.clip(change, 0, None), group, position, 1 / RSI_PERIOD, seed("avg_gain"))
+    result["avg_loss"] = exponential(np.clip(-change, 0, None), group, position, 1 / RSI_PERIOD, seed("avg_loss"))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result["rsi_14"] = 100 - 100 / (1 + result["avg_gain"] / result["avg_loss"])
+
+    middle = rolling(close, position, BOLLINGER_WINDOW, np.mean)
+    width = BOLLINGER_WIDTH * rolling(close, position, BOLLINGER_WINDOW, np.std)
+    result["bb_middle"] = middle
+    result["bb_upper"] = middle + width
+    result["bb_lower"] = middle - width
+
+    # Wilder's average true range; the first row's range is just high - low
+    true_range = np.fmax(np.fmax(high - low, np.abs(high - previous_close)), np.abs(low - previous_close))
+    result["atr_14"] = exponential(true_range, group, position, 1 / ATR_PERIOD, seed("atr_14"))
+    return pd.DataFrame(result, index=prices.index)
+
+# Extend stored indicators with newly ingested rows
+def update_indicators(prices, previous):
+    """Recompute only the tail of symbols whose stored rows are still their first rows, and all of any other symbol"""
+    if previous is None or previous.empty:
+        return compute_indicators(prices)
+
+    # Key codes shared by both frames
+    codes, symbols = pd.factorize(pd.concat([prices["_key"], previous["_key"]], ignore_index=True))
+    codes, stored_codes = codes[:len(prices)], codes[len(prices):]
+    group, position = group_positions(codes)
+    starts = np.flatnonzero(position == 0)
+    counts = np.diff(np.r_[starts, len(prices)])
+    stored_group, stored_position = group_positions(stored_codes)
+    stored_starts = np.flatnonzero(stored_position == 0)
+    stored_counts = np.diff(np.r_[stored_starts, len(previous)])
+
+    # Row of prices each stored row should be, if its symbol is still there
+    group_of_code = np.full(len(symbols), -1)
+    group_of_code[codes[starts]] = np.arange(len(starts))
+    target_group = group_of_code[stored_codes]
+    in_range = (target_group >= 0) & (stored_position < counts[target_group])
+    target_row = np.where(in_range, starts[target_group] + stored_position, 0)
+
+    # A symbol extends its stored rows when they match its first rows date for date
+    matches = in_range & (prices["Date"].to_numpy()[target_row] == previous["Date"].to_numpy())
+    extendable = np.bincount(stored_group, weights=matches, minlength=len(stored_starts)) == stored_counts
+    stored_group_of_code = np.full(len(symbols), -1)
+    stored_group_of_code[stored_codes[stored_starts]] = np.arange(len(stored_starts))
+    found = stored_group_of_code[codes[starts]]
+    stored_rows = np.where(found >= 0, np.where(extendable[found], stored_counts[found], 0), 0)
+
+    # Recompute from LOOKBACK rows before the first new row, seeded from the stored state there
+    start = np.maximum(stored_rows - LOOKBACK, 0)[group]
+    in_tail = position >= start
+    seed_rows = np.flatnonzero((position == start) & (start > 0))
+    seeds = np.full((len(prices), len(STATE_COLUMNS)), np.nan)
+    seeds[seed_rows] = previous[STATE_COLUMNS].to_numpy()[stored_starts[found[group[seed_rows]]] + position[seed_rows]]
+    seeds = pd.DataFrame(seeds, index=prices.index, columns=STATE_COLUMNS)
+
+    computed = compute_indicators(prices[in_tail], seeds[in_tail])
+    new_rows = computed[(position >= stored_rows[group])[in_tail]]
+    kept = previous[extendable[stored_group]]
+    updated = pd.concat([kept, new_rows], ignore_index=True)
+    return updated.sort_values(["_key", "Date"], kind="mergesort", ignore_index=True)
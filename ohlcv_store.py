@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import os
+import json
+import hashlib
+
+# Fixed-width record of one trading day; dates are nanoseconds since the epoch
+OHLCV_DTYPE = np.dtype([("date", "<i8"), ("open", "<f8"), ("high", "<f8"),
+                        ("low", "<f8"), ("close", "<f8"), ("volume", "<f8")])
+
+OHLCV_FIELDS = ["open", "high", "low", "close", "volume"]
+
+def index_path_for(csv_path):
+    """Offset table of a dataset's binary store, e.g. etf_week.csv -> etf_week.ohlcv.json"""
+    return os.path.splitext(csv_path)[0] + ".ohlcv.json"
+
+def write_ohlcv_store(csv_path, history, offsets, columns, signature):
+    """Write a history frame sorted by symbol and date as one contiguous record file"""
+    records = np.empty(len(history), dtype=OHLCV_DTYPE)
+    records["date"] = history["Date"].to_numpy("datetime64[ns]").view("i8")
+    for field, column in zip(OHLCV_FIELDS, columns):
+        records[field] = history[column].to_numpy(float) if column else np.nan
+
+    # Each revision gets its own data file so a reader never sees a table and
+    # records from different revisions
+    base = os.path.splitext(csv_path)[0]
+    data_file = f"{os.path.basename(base)}.{hashlib.sha1(signature.encode()).hexdigest()[:12]}.ohlcv"
+    data_path = os.path.join(os.path.dirname(csv_path), data_file)
+    records.tofile(data_path + ".tmp")
+    os.replace(data_path + ".tmp", data_path)
+
+    index_path = index_path_for(csv_path)
+    previous = read_index(index_path)
+    index = {"signature": signature, "data_file": data_file, "rows": len(records), "columns": columns,
+             "offsets": {symbol: [int(start), int(stop)] for symbol, (start, stop) in offsets.items()}}
+    with open(index_path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    os.replace(index_path + ".tmp", index_path)
+
+    if previous and previous["data_file"] != data_file:
+        try:
+            os.remove(os.path.join(os.path.dirname(csv_path), previous["data_file"]))
+        except OSError:
+            # Still mapped by another process on Windows; the next rebuild retries
+            pass
+
+def read_index(index_path):
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path, encoding='utf-8') as f:
+        return json.load(f)
+
+def open_ohlcv_store(csv_path, signature):
+    """Memory-map the store written for this source revision, or None if it is missing or stale"""
+    index = read_index(index_path_for(csv_path))
+    if index is None or index["signature"] != signature:
+        return None
+    data_path = os.path.join(os.path.dirname(csv_path), index["data_file"])
+    if index["rows"] == 0:
+        return np.empty(0, dtype=OHLCV_DTYPE), index
+    return np.memmap(data_path, dtype=OHLCV_DTYPE, mode='r', shape=(index["rows"],)), index
+
+def read_symbol(records, index, symbol):
+    """One symbol's rows with the dataset's own column names"""
+    first, last = index["offsets"].get(symbol, (0, 0))
+    rows = records[first:last]
+    df = pd.DataFrame({"Date": rows["date"].astype("datetime64[ns]")})
+    for field, column in zip(OHLCV_FIELDS, index["columns"]):
+        if column:
+            df[column] = rows[field]
+    return df
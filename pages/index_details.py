@@ -1,7 +1,6 @@
-import pandas as pd
 import streamlit as st
 import plotly.express as px
-import os
+from data_loader import load_dataset, load_bars
 
 # Set page configuration
 st.set_page_config(
@@ -320,50 +319,40 @@ indices = {
     "NIFTY BANK": {"description": "NIFTY BANK tracks the performance of the most liquid and large capitalized banking stocks."}
 }
 
+# Chart timeframe -> (button label, name)
+CHART_TIMEFRAMES = {
+    "D": ("1D", "Daily"),
+    "W": ("1W", "Weekly"),
+    "M": ("1M", "Monthly"),
+    "Q": ("1Q", "Quarterly"),
+    "Y": ("1Y", "Yearly")
+}
+
 # Load data function
-@st.cache_data
 def load_data():
     try:
-        base_path = r"C:\Users\Srujan KV\Desktop\Srujan Zenshastra\WEEK 7\Indian stockk dashboard"
-        index_week = pd.read_csv(os.path.join(base_path, 'index_week.csv'))
-        index_week.columns = index_week.columns.str.strip()
-        index_week['Date'] = pd.to_datetime(index_week['Date'])
-        index_week['Close'] = index_week['Close'].astype(str).str.replace(',', '').astype(float)
-
-        index_month = pd.read_csv(os.path.join(base_path, 'index_month.csv'))
-        index_month.columns = index_month.columns.str.strip()
-        index_month['Date'] = pd.to_datetime(index_month['Date'])
-        index_month['Close'] = index_month['Close'].astype(str).str.replace(',', '').astype(float)
-
-        index_data = pd.read_csv(os.path.join(base_path, 'index_data.csv'))
-        index_data.columns = [col.strip() for col in index_data.columns]
-
-        return index_week, index_month, index_data
+        return load_dataset("index_data")
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
-        return None, None, None
+        return None
 
 # Get index data function
 def get_index_data(index_name):
     try:
-        index_week, index_month, index_data = load_data()
-        if any(data is None for data in [index_week, index_month, index_data]):
+        index_data = load_data()
+        if index_data is None:
             return None
 
-        weekly_perf = index_week[index_week['Index Name'].str.strip() == index_name].sort_values('Date')
-        monthly_perf = index_month[index_month['Index Name'].str.strip() == index_name].sort_values('Date')
         
         index_row = index_data[index_data['SYMBOL'].str.strip() == index_name].iloc[0]
-        ltp = float(str(index_row['LTP']).replace(',', ''))
-        change = float(str(index_row['CHNG']).replace(',', ''))
-        percent_change = float(str(index_row['%CHNG']).replace(',', ''))
-        week_52_high = float(str(index_row['52W H']).replace(',', ''))
-        week_52_low = float(str(index_row['52W L']).replace(',', ''))
-        value = float(str(index_row['VALUE (₹ Crores)']).replace(',', ''))
+        ltp = float(index_row['LTP'])
+        change = float(index_row['CHNG'])
+        percent_change = float(index_row['%CHNG'])
+        week_52_high = float(index_row['52W H'])
+        week_52_low = float(index_row['52W L'])
+        value = float(index_row['VALUE (₹ Crores)'])
         
         return {
-            'weekly_performance': weekly_perf,
-            'monthly_performance': monthly_perf,
             'ltp': ltp,
             'change': change,
             'percent_change': percent_change,
@@ -452,26 +441,24 @@ def main():
     col1, col2 = st.columns([4, 1])
     with col2:
         st.markdown('<div class="toggle-container">', unsafe_allow_html=True)
-        weekly = st.button("1W", key="weekly", help="Show weekly data")
-        monthly = st.button("1M", key="monthly", help="Show monthly data")
+        for timeframe, (label, name) in CHART_TIMEFRAMES.items():
+            if st.button(label, key=f"timeframe_{timeframe}", help=f"Show {name.lower()} bars"):
+                st.session_state['chart_view'] = timeframe
         st.markdown('</div>', unsafe_allow_html=True)
     
-    if 'chart_view' not in st.session_state:
-        st.session_state['chart_view'] = 'weekly'
-    
-    if weekly:
-        st.session_state['chart_view'] = 'weekly'
-    if monthly:
-        st.session_state['chart_view'] = 'monthly'
+    if st.session_state.get('chart_view') not in CHART_TIMEFRAMES:
+        st.session_state['chart_view'] = 'D'
     
-    if st.session_state['chart_view'] == 'weekly':
-        data = index_data['weekly_performance']
-        title = "Weekly Performance"
-    else:
-        data = index_data['monthly_performance']
-        title = "Monthly Performance"
+    # Every timeframe is resampled from the one daily series
+    timeframe = st.session_state['chart_view']
+    try:
+        data = load_bars("index", index_name.strip().upper(), timeframe)
+    except Exception as e:
+        st.error(f"Error loading index history: {str(e)}")
+        data = None
+    title = f"{CHART_TIMEFRAMES[timeframe][1]} Performance"
     
-    if not data.empty and not data['Close'].isna().all():
+    if data is not None and not data.empty and not data['Close'].isna().all():
         fig = px.line(data, x='Date', y='Close',
                      title=f"{index_name} - {title}",
                      template="plotly_white" if not st.session_state.get('dark_mode', False) else "plotly_dark")
@@ -501,7 +488,7 @@ def main():
         
         with col1:
             st.plotly_chart(fig, use_container_width=True)
-    else:
+    elif data is not None:
         st.info(f"No {title.lower()} data available for {index_name}")
     
     st.markdown("</div>", unsafe_allow_html=True)
@@ -0,0 +1,119 @@
+import streamlit as st
+import plotly.express as px
+from sectors import stocks, sector_symbols
+from data_loader import load_risk_metrics, load_correlation, load_card_table
+
+# Set page configuration
+st.set_page_config(
+    page_title="Risk Analytics",
+    page_icon="📉",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Modern CSS
+st.markdown("""
+<style>
+    :root {
+        --primary: #4f46e5; /* Indigo */
+        --accent: #14b8a6; /* Teal */
+        --background: #f9fafb; /* Light Gray */
+        --text: #111827; /* Dark Gray */
+    }
+
+    .stApp {
+        background-color: var(--background);
+        color: var(--text);
+        font-family: 'Segoe UI', 'Helvetica Neue', Arial, sans-serif;
+    }
+
+    .risk-header {
+        background: linear-gradient(135deg, var(--primary) 0%, var(--accent) 100%);
+        padding: 2rem 1rem;
+        border-radius: 12px;
+        text-align: center;
+        margin-bottom: 2rem;
+        color: white;
+    }
+
+    .risk-title {
+        font-size: 2.25rem;
+        font-weight: 700;
+    }
+
+    .section-header {
+        font-size: 1.5rem;
+        font-weight: 600;
+        margin: 1.5rem 0 1rem;
+        border-bottom: 2px solid var(--primary);
+        padding-bottom: 0.5rem;
+    }
+</style>
+""", unsafe_allow_html=True)
+
+# Instrument type -> label
+UNIVERSES = {"etf": "Stocks", "index": "Indices"}
+
+# Stock groups offered for the correlation matrix, besides each sector
+LARGEST_PRESET = "Largest by Market Cap"
+LARGEST_PRESET_SIZE = 10
+
+def preset_symbols(preset, symbols):
+    """Symbols of a correlation preset that have price history"""
+    if preset == LARGEST_PRESET:
+        cards = load_card_table()
+        ranked = cards["market_cap_value"].reindex(symbols).sort_values(ascending=False, na_position='last')
+        return list(ranked.index[:LARGEST_PRESET_SIZE])
+    return [symbol for symbol in sector_symbols(preset) if symbol in symbols]
+
+def main():
+    st.markdown("""
+    <div class="risk-header">
+        <div class="risk-title">Risk Analytics</div>
+        <div>Returns, volatility, drawdowns and correlations across the universe</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    kind = st.radio("Universe", list(UNIVERSES), format_func=UNIVERSES.get, horizontal=True, key="risk_universe")
+    try:
+        metrics = load_risk_metrics(kind)
+    except Exception as e:
+        st.error(f"Error loading price history: {str(e)}")
+        return
+
+    st.markdown('<div class="section-header">Risk Metrics</div>', unsafe_allow_html=True)
+    st.caption(f"{len(metrics)} symbols; volatility is annualized from daily returns")
+    st.dataframe(metrics, width='stretch', column_config={
+        column: st.column_config.NumberColumn(format="%.2f") for column in metrics.columns if column.endswith('%')
+    })
+
+    st.markdown('<div class="section-header">Correlation Matrix</div>', unsafe_allow_html=True)
+    if kind == "index":
+        defaults = list(metrics.index)
+        key = "correlation_symbols_index"
+    else:
+        preset = st.selectbox("Group", [LARGEST_PRESET] + list(stocks["Sector"]), key="correlation_preset")
+        defaults = preset_symbols(preset, metrics.index)
+        # One selection per preset, so switching presets restores its symbols
+        key = f"correlation_symbols_{preset}"
+    symbols = st.multiselect("Symbols", list(metrics.index), default=defaults, key=key)
+    if len(symbols) < 2:
+        st.info("Select at least two symbols to correlate.")
+        return
+
+    correlation = load_correlation(kind, symbols)
+    fig = px.imshow(correlation, text_auto=".2f", zmin=-1, zmax=1, color_continuous_scale="RdBu",
+                    aspect="auto", title="Correlation of Daily Returns",
+                    template="plotly_white" if not st.session_state.get('dark_mode', False) else "plotly_dark")
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(t=50, r=10, b=30, l=60)
+    )
+    st.plotly_chart(fig, width='stretch')
+
+    if st.button("← Back to Dashboard", key="back_main"):
+        st.switch_page("home.py")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
-import pandas as pd
 import streamlit as st
 import plotly.express as px
-import os
 import random
+import math
+from sectors import stocks
+from data_loader import load_bars, load_snapshot_index, load_market_cap_classes, load_indicators, load_symbol_benchmarks
 
 # Set page configuration
 st.set_page_config(
@@ -155,6 +156,12 @@ st.markdown("""
         color: var(--text);
     }
 
+    .metric-detail {
+        font-size: 0.8rem;
+        color: var(--text-light);
+        margin-top: 0.25rem;
+    }
+
     /* Chart Container */
     .chart-container {
         background: var(--card);
@@ -234,114 +241,77 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Define stock data
-stocks = {
-    "Sector": {
-        "Tech": [
-            {"symbol": "INFY", "company": "Infosys Ltd.", "description": "Infosys is a global leader in next-generation digital services and consulting."},
-            {"symbol": "TCS", "company": "Tata Consultancy Services Ltd.", "description": "TCS is a leading global IT services, consulting, and business solutions organization."},
-            {"symbol": "COFORGE", "company": "Coforge Ltd.", "description": "Coforge is a global IT solutions organization providing digital services."},
-            {"symbol": "MASTEK", "company": "Mastek Ltd.", "description": "Mastek provides enterprise technology solutions and digital transformation services."}
-        ],
-        "Finance": [
-            {"symbol": "HDFCBANK", "company": "HDFC Bank Ltd.", "description": "HDFC Bank is one of India's premier banking institutions."},
-            {"symbol": "SBIN", "company": "State Bank of India", "description": "SBI is India's largest public sector bank providing comprehensive banking services."},
-            {"symbol": "IDFCFIRSTB", "company": "IDFC First Bank Ltd.", "description": "IDFC First Bank offers banking and financial services with a focus on retail and business banking."},
-            {"symbol": "DCBBANK", "company": "DCB Bank Ltd.", "description": "DCB Bank provides banking services to individuals and businesses in India."}
-        ],
-        "Energy": [
-            {"symbol": "TATAPOWER", "company": "Tata Power Company Ltd.", "description": "Tata Power is one of India's largest integrated power companies."},
-            {"symbol": "ADANIGREEN", "company": "Adani Green Energy Ltd.", "description": "Adani Green is a leading renewable energy company in India."},
-            {"symbol": "NHPC", "company": "NHPC Ltd.", "description": "NHPC is a major hydropower generation company in India."},
-            {"symbol": "RELINFRA", "company": "Reliance Infrastructure Ltd.", "description": "Reliance Infra is involved in power generation, transmission, and distribution."}
-        ],
-        "Consumer": [
-            {"symbol": "HINDUNILVR", "company": "Hindustan Unilever Ltd.", "description": "Hindustan Unilever is a leading consumer goods company in India."},
-            {"symbol": "ITC", "company": "ITC Ltd.", "description": "ITC is a diversified conglomerate with a strong presence in FMCG."},
-            {"symbol": "BAJAJELEC", "company": "Bajaj Electricals Ltd.", "description": "Bajaj Electricals is a consumer electrical equipment manufacturing company."},
-            {"symbol": "VOLTAS", "company": "Voltas Ltd.", "description": "Voltas is a leading air conditioning and engineering services company."}
-        ]
-    }
+# Chart timeframe -> (button label, name)
+CHART_TIMEFRAMES = {
+    "D": ("1D", "Daily"),
+    "W": ("1W", "Weekly"),
+    "M": ("1M", "Monthly"),
+    "Q": ("1Q", "Quarterly"),
+    "Y": ("1Y", "Yearly")
+}
+
+# Indicator overlays on the price chart: name -> (indicator column, line color)
+PRICE_OVERLAYS = {
+    "SMA 20": [("sma_20", "#f59e0b")],
+    "SMA 50": [("sma_50", "#ef4444")],
+    "EMA 12": [("ema_12", "#10b981")],
+    "EMA 26": [("ema_26", "#8b5cf6")],
+    "Bollinger Bands": [("bb_upper", "#94a3b8"), ("bb_middle", "#64748b"), ("bb_lower", "#94a3b8")]
+}
+
+# Indicators drawn below the price chart: name -> indicator columns
+OSCILLATORS = {
+    "RSI 14": ["rsi_14"],
+    "MACD": ["macd", "macd_signal", "macd_hist"],
+    "ATR 14": ["atr_14"]
 }
 
 # Load data function
-@st.cache_data
 def load_data():
     try:
-        weekly_data = pd.read_csv('etf_week.csv')
-        weekly_data.columns = weekly_data.columns.str.strip()
-        weekly_data = weekly_data[['Date', 'Symbol', 'Close Price']]
-        weekly_data['Date'] = pd.to_datetime(weekly_data['Date'])
-        weekly_data['Close Price'] = weekly_data['Close Price'].astype(str).str.replace(',', '').astype(float)
-
-        monthly_data = pd.read_csv('etf_month.csv')
-        monthly_data.columns = monthly_data.columns.str.strip()
-        monthly_data = monthly_data[['Date', 'Symbol', 'Close Price']]
-        monthly_data['Date'] = pd.to_datetime(monthly_data['Date'])
-        monthly_data['Close Price'] = monthly_data['Close Price'].astype(str).str.replace(',', '').astype(float)
-
-        high_low_data = pd.read_csv('52W-high-low.csv')
-        high_low_data.columns = high_low_data.columns.str.strip()
-
-        pe_data = pd.read_csv('PE.csv')
-        pe_data.columns = pe_data.columns.str.strip()
-
-        traded_data = pd.read_csv('StocksTraded.csv')
-        traded_data.columns = traded_data.columns.str.strip()
-
-        return weekly_data, monthly_data, high_low_data, pe_data, traded_data
+        return load_snapshot_index()
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
-        return None, None, None, None, None
+        return None
 
 # Get stock data function
 def get_stock_data(symbol):
     try:
-        weekly_data, monthly_data, high_low_data, pe_data, traded_data = load_data()
-        if any(data is None for data in [weekly_data, monthly_data, high_low_data, pe_data, traded_data]):
+        snapshot_index = load_data()
+        if snapshot_index is None:
             return None
 
         symbol = symbol.strip().upper()
-        weekly_perf = weekly_data[weekly_data['Symbol'].str.strip().str.upper() == symbol].sort_values('Date')
-        monthly_perf = monthly_data[monthly_data['Symbol'].str.strip().str.upper() == symbol].sort_values('Date')
+        
+        record = snapshot_index.get(symbol, {})
         
         try:
-            high_low = high_low_data[high_low_data['SYMBOL'].str.strip().str.upper() == symbol].iloc[0]
-            week_52_high = float(str(high_low['Adjusted 52_Week_High']).replace(',', ''))
-            week_52_low = float(str(high_low['Adjusted 52_Week_Low']).replace(',', ''))
-        except (IndexError, ValueError):
+            week_52_high = float(record['Adjusted 52_Week_High'])
+            week_52_low = float(record['Adjusted 52_Week_Low'])
+        except (KeyError, ValueError):
             week_52_high = 0
             week_52_low = 0
         
         try:
-            pe = float(pe_data[pe_data['SYMBOL'].str.strip().str.upper() == symbol].iloc[0]['ADJUSTED P/E'])
-        except (IndexError, ValueError):
+            pe = float(record['ADJUSTED P/E'])
+        except (KeyError, ValueError):
             pe = 0
         
         yield_value = round(random.uniform(1, 5), 2)
         
         try:
-            traded = traded_data[traded_data['Symbol'].str.strip().str.upper() == symbol].iloc[0]
-            ltp = float(str(traded['LTP']).replace(',', ''))
-            percent_change = float(str(traded['%chng']).replace(',', ''))
-            market_cap_value = float(str(traded['Mkt Cap (₹ Crores)']).replace(',', ''))
+            ltp = float(record['LTP'])
+            percent_change = float(record['%chng'])
+            market_cap_value = float(record['Mkt Cap (₹ Crores)'])
             market_cap = f"₹{market_cap_value:,.2f} Cr"
-            
-            if market_cap_value > 50000:
-                market_cap_class = "Large-cap"
-            elif 16000 <= market_cap_value <= 50000:
-                market_cap_class = "Mid-cap"
-            else:
-                market_cap_class = "Small-cap"
-        except (IndexError, ValueError):
+            market_cap_class = load_market_cap_classes()[symbol]
+        except (KeyError, ValueError):
             ltp = 0
             percent_change = 0
             market_cap = "N/A"
             market_cap_class = "N/A"
         
         return {
-            'weekly_performance': weekly_perf,
-            'monthly_performance': monthly_perf,
             '52_week_high': week_52_high,
             '52_week_low': week_52_low,
             'pe_ratio': pe,
@@ -372,6 +342,8 @@ def display_stock_card(symbol, stock_info, stock_data):
             change_icon = '—'
         
         company_name = stock_info.get('company', 'Unknown Company')
+        company_html = f"""<div style="font-size: 1.2rem; color: var(--text-light); display: inline;"> • </div>
+            <div style="font-size: 1.2rem; color: var(--text-light); display: inline;">{company_name}</div>""" if company_name else ""
     except Exception as e:
         st.error(f"Error preparing stock data: {e}")
         return
@@ -380,8 +352,7 @@ def display_stock_card(symbol, stock_info, stock_data):
     <div class="stock-card">
         <div class="stock-title">
             {symbol}
-            <div style="font-size: 1.2rem; color: var(--text-light); display: inline;"> • </div>
-            <div style="font-size: 1.2rem; color: var(--text-light); display: inline;">{company_name}</div>
+            {company_html}
         </div>
         <div class="price-container">
             <div class="current-price">{ltp_display}</div>
@@ -397,6 +368,26 @@ def display_stock_card(symbol, stock_info, stock_data):
     except Exception as e:
         st.error(f"Error rendering stock card: {e}")
 
+# Function to display beta, alpha and relative strength against each index
+def display_benchmark_cards(symbol):
+    try:
+        statistics = load_symbol_benchmarks(symbol)
+    except Exception as e:
+        st.error(f"Error loading index comparison: {e}")
+        return
+
+    def percent(value):
+        return "N/A" if math.isnan(value) else f"{'+' if value >= 0 else ''}{value * 100:.2f}%"
+
+    cards = "".join(f"""
+        <div class="metric-card">
+            <div class="metric-label">vs {benchmark}</div>
+            <div class="metric-value">β {"N/A" if math.isnan(row['beta']) else f"{row['beta']:.2f}"}</div>
+            <div class="metric-detail">Alpha {percent(row['alpha'])} p.a. • Relative strength {percent(row['relative_strength'])}</div>
+        </div>""" for benchmark, row in statistics.iterrows())
+    st.markdown(f'<div class="metrics-grid">{cards}</div>', unsafe_allow_html=True)
+    st.caption("Over the last 60 trading days of daily returns, aligned by date with each index.")
+
 def main():
     symbol = st.session_state.get('selected_symbol', None)
     
@@ -415,6 +406,11 @@ def main():
         if stock_info:
             break
     
+    # Listed stocks outside the curated sectors have no company overview
+    snapshot_index = load_data()
+    if not stock_info and snapshot_index is not None and symbol.strip().upper() in snapshot_index:
+        stock_info = {"symbol": symbol, "company": "", "description": None}
+    
     if not stock_info:
         st.error(f"Stock {symbol} not found in the database.")
         if st.button("Back to Dashboard", key="back_not_found"):
@@ -430,12 +426,13 @@ def main():
 
     display_stock_card(symbol, stock_info, stock_data)
     
-    st.markdown(f"""
-    <div class="description-card">
-        <div class="description-title">Company Overview</div>
-        <div class="description-content">{stock_info['description']}</div>
-    </div>
-    """, unsafe_allow_html=True)
+    if stock_info['description']:
+        st.markdown(f"""
+        <div class="description-card">
+            <div class="description-title">Company Overview</div>
+            <div class="description-content">{stock_info['description']}</div>
+        </div>
+        """, unsafe_allow_html=True)
     
     st.markdown(f"""
     <div class="metrics-grid">
@@ -465,6 +462,8 @@ def main():
         </div>
     </div>
     """, unsafe_allow_html=True)
+
+    display_benchmark_cards(symbol)
     
     st.markdown("""
     <div class="chart-container">
@@ -474,26 +473,40 @@ def main():
     col1, col2 = st.columns([5, 1])
     with col2:
         st.markdown('<div class="toggle-container">', unsafe_allow_html=True)
-        weekly = st.button("1W", key="weekly", help="Show weekly data")
-        monthly = st.button("1M", key="monthly", help="Show monthly data")
+        for timeframe, (label, name) in CHART_TIMEFRAMES.items():
+            if st.button(label, key=f"timeframe_{timeframe}", help=f"Show {name.lower()} bars"):
+                st.session_state['chart_view'] = timeframe
         st.markdown('</div>', unsafe_allow_html=True)
     
-    if 'chart_view' not in st.session_state:
-        st.session_state['chart_view'] = 'weekly'
+    if st.session_state.get('chart_view') not in CHART_TIMEFRAMES:
+        st.session_state['chart_view'] = 'D'
     
-    if weekly:
-        st.session_state['chart_view'] = 'weekly'
-    if monthly:
-        st.session_state['chart_view'] = 'monthly'
+    # Every timeframe is resampled from the one daily series
+    timeframe = st.session_state['chart_view']
+    try:
+        data = load_bars("etf", symbol, timeframe)
+    except Exception as e:
+        st.error(f"Error loading price history: {str(e)}")
+        data = None
+    title = f"{CHART_TIMEFRAMES[timeframe][1]} Performance"
     
-    if st.session_state['chart_view'] == 'weekly':
-        data = stock_data['weekly_performance']
-        title = "Weekly Performance"
-    else:
-        data = stock_data['monthly_performance']
-        title = "Monthly Performance"
+    # Indicators are precomputed from daily bars for every symbol per data
+    # snapshot, so they are only drawn over the daily chart
+    overlays, oscillator, indicators = [], "None", None
+    with col2:
+        if timeframe == 'D':
+            overlays = st.multiselect("Overlays", list(PRICE_OVERLAYS), default=["SMA 20"], key="overlays")
+            oscillator = st.selectbox("Oscillator", ["None"] + list(OSCILLATORS), key="oscillator")
+        else:
+            st.caption("Indicators are computed from daily bars; switch to 1D to show them.")
+    if overlays or oscillator != "None":
+        try:
+            indicators = load_indicators("etf", symbol)
+        except Exception as e:
+            st.error(f"Error loading indicators: {str(e)}")
+            overlays, oscillator = [], "None"
     
-    if not data.empty and not data['Close Price'].isna().all():
+    if data is not None and not data.empty and not data['Close Price'].isna().all():
         fig = px.line(data, x='Date', y='Close Price',
                      title=f"{symbol} - {title}",
                      template="plotly_white" if not st.session_state.get('dark_mode', False) else "plotly_dark")
@@ -514,8 +527,32 @@ def main():
             hovertemplate='₹%{y:,.2f}<extra></extra>'
         )
         
+        for overlay in overlays:
+            for column, color in PRICE_OVERLAYS[overlay]:
+                fig.add_scatter(x=indicators['Date'], y=indicators[column], name=column.upper().replace('_', ' '),
+                                mode='lines', line=dict(color=color, width=1.5),
+                                hovertemplate='₹%{y:,.2f}<extra>%{fullData.name}</extra>')
+        if overlays:
+            fig.data[0].name = "Close"
+            fig.update_layout(showlegend=True)
+        
         st.plotly_chart(fig, use_container_width=True)
-    else:
+        
+        if oscillator != "None" and indicators is not None and not indicators.empty:
+            oscillator_fig = px.line(indicators, x='Date', y=OSCILLATORS[oscillator],
+                                     title=f"{symbol} - {oscillator}",
+                                     template="plotly_white" if not st.session_state.get('dark_mode', False) else "plotly_dark")
+            oscillator_fig.update_layout(
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                xaxis_title="Date",
+                yaxis_title=oscillator,
+                hovermode='x unified',
+                height=260,
+                margin=dict(t=30, r=10, b=30, l=60)
+            )
+            st.plotly_chart(oscillator_fig, use_container_width=True)
+    elif data is not None:
         st.info(f"No {title.lower()} data available for {symbol}")
     
     st.markdown("</div>", unsafe_allow_html=True)
@@ -0,0 +1,126 @@
+import streamlit as st
+import time
+from data_loader import load_card_table, run_screen
+from screener import SCREEN_FIELDS, OPERATORS
+
+# Set page configuration
+st.set_page_config(
+    page_title="Stock Screener",
+    page_icon="🔎",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Modern CSS
+st.markdown("""
+<style>
+    :root {
+        --primary: #4f46e5; /* Indigo */
+        --accent: #14b8a6; /* Teal */
+        --background: #f9fafb; /* Light Gray */
+        --text: #111827; /* Dark Gray */
+    }
+
+    .stApp {
+        background-color: var(--background);
+        color: var(--text);
+        font-family: 'Segoe UI', 'Helvetica Neue', Arial, sans-serif;
+    }
+
+    .screener-header {
+        background: linear-gradient(135deg, var(--primary) 0%, var(--accent) 100%);
+        padding: 2rem 1rem;
+        border-radius: 12px;
+        text-align: center;
+        margin-bottom: 2rem;
+        color: white;
+    }
+
+    .screener-title {
+        font-size: 2.25rem;
+        font-weight: 700;
+    }
+
+    .section-header {
+        font-size: 1.5rem;
+        font-weight: 600;
+        margin: 1.5rem 0 1rem;
+        border-bottom: 2px solid var(--primary);
+        padding-bottom: 0.5rem;
+    }
+</style>
+""", unsafe_allow_html=True)
+
+# Filters enabled when the page first opens: field -> (operator, value)
+DEFAULT_FILTERS = {
+    "pe_ratio": ("<", 20.0),
+    "pct_below_52w_high": ("<=", 5.0),
+    "market_cap_value": (">", 16000.0)
+}
+
+# Result table columns: card table column -> header
+RESULT_COLUMNS = {
+    "ltp": "Price (₹)",
+    "percent_change": "% Change",
+    "pe_ratio": "P/E",
+    "market_cap_value": "Market Cap (₹ Cr)",
+    "value_traded": "Value Traded (₹ Cr)",
+    "week_52_high": "52W High",
+    "week_52_low": "52W Low",
+    "market_cap_class": "Category"
+}
+
+# One row of filter controls per field; returns the filter if enabled
+def filter_row(field, label):
+    default_op, default_value = DEFAULT_FILTERS.get(field, (">", 0.0))
+    enabled_col, op_col, value_col = st.columns([2, 1, 2])
+    enabled = enabled_col.checkbox(label, value=field in DEFAULT_FILTERS, key=f"enabled_{field}")
+    operators = list(OPERATORS)
+    op = op_col.selectbox("Operator", operators, index=operators.index(default_op),
+                          key=f"op_{field}", label_visibility="collapsed", disabled=not enabled)
+    value = value_col.number_input("Value", value=default_value, key=f"value_{field}",
+                                   label_visibility="collapsed", disabled=not enabled)
+    return (field, op, float(value)) if enabled else None
+
+def main():
+    st.markdown("""
+    <div class="screener-header">
+        <div class="screener-title">Stock Screener</div>
+        <div>Filter every listed stock by valuation, size, liquidity and 52-week range</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown('<div class="section-header">Filters</div>', unsafe_allow_html=True)
+    filters = []
+    for field, label in SCREEN_FIELDS.items():
+        selected = filter_row(field, label)
+        if selected:
+            filters.append(selected)
+
+    try:
+        cards = load_card_table()
+        start = time.perf_counter()
+        # A tuple of filters is hashable, so repeated combinations hit the cache
+        positions = run_screen(tuple(filters))
+        elapsed = (time.perf_counter() - start) * 1000
+    except Exception as e:
+        st.error(f"Error running screen: {str(e)}")
+        return
+
+    st.markdown('<div class="section-header">Results</div>', unsafe_allow_html=True)
+    st.caption(f"{len(positions)} matching stocks in {elapsed:.1f} ms")
+    results = cards.iloc[positions][list(RESULT_COLUMNS)].rename(columns=RESULT_COLUMNS)
+    results = results.sort_values("Market Cap (₹ Cr)", ascending=False)
+    st.dataframe(results, width='stretch', column_config={
+        "Price (₹)": st.column_config.NumberColumn(format="%.2f"),
+        "% Change": st.column_config.NumberColumn(format="%+.2f%%"),
+        "P/E": st.column_config.NumberColumn(format="%.2f"),
+        "Market Cap (₹ Cr)": st.column_config.NumberColumn(format="%.2f"),
+        "Value Traded (₹ Cr)": st.column_config.NumberColumn(format="%.2f")
+    })
+
+    if st.button("← Back to Dashboard", key="back_main"):
+        st.switch_page("home.py")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+# Risk analytics run on a panel: one row per trading date and one column
+# per symbol of closing prices, NaN where a symbol did not trade. The
+# panel is pivoted once from the daily prices and new dates are written
+# into spare rows, so readers keep slicing the same arrays.
+
+TRADING_DAYS = 252
+
+def allocate(dates, symbols, close, capacity, price_rows):
+    """Panel dict over close[:len(dates)], with room for capacity dates; price_rows counts the
+    (symbol, date) rows it was filled from, including those with a missing close"""
+    buffer = np.full((capacity, len(symbols)), np.nan)
+    buffer[:len(dates)] = close
+    date_buffer = np.empty(capacity, dtype="datetime64[ns]")
+    date_buffer[:len(dates)] = dates
+    return {"dates": date_buffer, "symbols": symbols, "close": buffer, "rows": len(dates),
+            "price_rows": price_rows}
+
+# Pivot daily prices into a date x symbol panel
+def build_panel(prices):
+    """prices has _key, Date and close columns, one row per symbol and date"""
+    date_codes, dates = pd.factorize(prices["Date"], sort=True)
+    symbol_codes, symbols = pd.factorize(prices["_key"], sort=True)
+    close = np.full((len(dates), len(symbols)), np.nan)
+    close[date_codes, symbol_codes] = prices["close"].to_numpy(float)
+    return allocate(dates.to_numpy("datetime64[ns]"), pd.Index(symbols), close, len(dates) + 64, len(prices))
+
+# Append new dates to a panel in place
+def extend_panel(panel, prices):
+    """Write the rows dated after the panel's last date into its spare rows.
+    Returns False when the prices changed in any other way and the panel must be rebuilt."""
+    last_date = panel["dates"][panel["rows"] - 1] if panel["rows"] else np.datetime64("NaT")
+    is_new = prices["Date"].to_numpy("datetime64[ns]") > last_date
+    new_rows = prices[is_new]
+    if len(prices) - len(new_rows) != panel["price_rows"]:
+        return False
+    symbol_codes = panel["symbols"].get_indexer(new_rows["_key"])
+    if (symbol_codes < 0).any():
+        return False
+    if new_rows.empty:
+        return True
+
+    date_codes, dates = pd.factorize(new_rows["Date"], sort=True)
+    rows = panel["rows"]
+    if rows + len(dates) > len(panel["dates"]):
+        # Out of spare rows: move to a larger buffer, old views stay valid
+        panel.update(allocate(panel["dates"][:rows], panel["symbols"], panel["close"][:rows],
+                              2 * (rows + len(dates)), panel["price_rows"]))
+    panel["close"][rows + date_codes, symbol_codes] = new_rows["close"].to_numpy(float)
+    panel["dates"][rows:rows + len(dates)] = dates.to_numpy("datetime64[ns]")
+    # Publish the rows only once they are written
+    panel["price_rows"] += len(new_rows)
+    panel["rows"] = rows + len(dates)
+    return True
+
+def panel_view(panel):
+    """Read-only (dates, symbols, close) of the filled rows"""
+    rows = panel["rows"]
+    dates, close = panel["dates"][:rows], panel["close"][:rows]
+    dates.flags.writeable = False
+    close.flags.writeable = False
+    return dates, panel["symbols"], close
+
+def period_returns(close, step=1):
+    """Simple returns over step rows; rows are dates"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return close[step:] / close[:-step] - 1
+
+def weekly_closes(dates, close):
+    """Last close of each calendar week (weeks ending Friday)"""
+    weeks = pd.DatetimeIndex(dates).to_period("W-FRI").asi8
+    last_of_week = np.r_[weeks[1:] != weeks[:-1], True] if len(weeks) else np.zeros(0, dtype=bool)
+    return dates[last_of_week], close[last_of_week]
+
+def rolling_volatility(returns, window=20, periods_per_year=TRADING_DAYS):
+    """Annualized standard deviation of each trailing window of returns; NaN unless all window returns exist"""
+    valid = ~np.isnan(returns)
+    values = np.where(valid, returns, 0.0)
+    sums = np.cumsum(np.vstack([np.zeros((1, returns.shape[1])), values]), axis=0)
+    squares = np.cumsum(np.vstack([np.zeros((1, returns.shape[1])), values ** 2]), axis=0)
+    counts = np.cumsum(np.vstack([np.zeros((1, returns.shape[1])), valid]), axis=0)
+    window_sum = sums[window:] - sums[:-window]
+    window_squares = squares[window:] - squares[:-window]
+    full = (counts[window:] - counts[:-window]) == window
+    variance = np.maximum(window_squares / window - (window_sum / window) ** 2, 0)
+    return np.where(full, np.sqrt(variance * periods_per_year), np.nan)
+
+def drawdowns(close):
+    """Decline from the running peak at each date, e.g. -0.25 for 25% below the high"""
+    peaks = np.fmax.accumulate(close, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return close / peaks - 1
+
+# N x N correlation over each pair's common dates
+def correlation_matrix(returns, min_periods=10):
+    """Pairwise-complete Pearson correlation of the return columns, NaN below min_periods shared dates"""
+    valid = (~np.isnan(returns)).astype(float)
+    values = np.where(valid > 0, returns, 0.0)
+    # Every pairwise sum restricted to common dates is one matrix product
+    counts = valid.T @ valid
+    sum_x = values.T @ valid
+    sum_xx = (values ** 2).T @ valid
+    sum_xy = values.T @ values
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = sum_xy - sum_x * sum_x.T / counts
+        variance_x = sum_xx - sum_x ** 2 / counts
+        correlation = covariance / np.sqrt(variance_x * variance_x.T)
+    correlation[counts < min_periods] = np.nan
+    return np.clip(correlation, -1, 1)
+
+# Benchmark-relative statistics: every symbol's daily returns against each
+# benchmark's over the same trailing dates, aligned by calendar date.
+
+def align_panel(dates, close, target_dates):
+    """Rows of close re-indexed onto target_dates, NaN where a date is missing"""
+    positions = np.searchsorted(dates, target_dates)
+    found = positions < len(dates)
+    found[found] = dates[positions[found]] == target_dates[found]
+    aligned = np.full((len(target_dates), close.shape[1]), np.nan)
+    aligned[found] = close[positions[found]]
+    return aligned
+
+def trailing_sum(values, window):
+    """Sum of each row's trailing window of rows, over however many rows exist at the start"""
+    sums = np.cumsum(np.vstack([np.zeros((1,) + values.shape[1:]), values]), axis=0)
+    starts = np.maximum(np.arange(1, len(values) + 1) - window, 0)
+    return sums[1:] - sums[starts]
+
+# Rolling beta, alpha and relative strength of every symbol against one benchmark
+def benchmark_statistics(returns, benchmark_returns, window=60, min_periods=10, periods_per_year=TRADING_DAYS):
+    """Dict of (dates x symbols) arrays over each trailing window of dates both returned on:
+    beta, annualized alpha (risk-free rate taken as zero) and relative strength, the
+    symbol's compounded return over the benchmark's. NaN below min_periods shared dates."""
+    benchmark = np.broadcast_to(benchmark_returns[:, None], returns.shape)
+    paired = ~np.isnan(returns) & ~np.isnan(benchmark)
+    x = np.where(paired, returns, 0.0)
+    y = np.where(paired, benchmark, 0.0)
+    counts = trailing_sum(paired.astype(float), window)
+    sum_x, sum_y = trailing_sum(x, window), trailing_sum(y, window)
+    sum_xy, sum_yy = trailing_sum(x * y, window), trailing_sum(y * y, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta = (sum_xy - sum_x * sum_y / counts) / (sum_yy - sum_y ** 2 / counts)
+        alpha = (sum_x - beta * sum_y) / counts * periods_per_year
+        relative_strength = np.exp(trailing_sum(np.log1p(x) - np.log1p(y), window)) - 1
+    short = counts < min_periods
+    for values in (beta, alpha, relative_strength):
+        values[short] = np.nan
+    return {"beta": beta, "alpha": alpha, "relative_strength": relative_strength}
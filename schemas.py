@@ -0,0 +1,194 @@
+import pandas as pd
+import os
+
+# Directory holding the exchange CSVs, overridable with STOCKS_DATA_DIR
+DATA_DIR = os.environ.get("STOCKS_DATA_DIR", os.path.dirname(os.path.abspath(__file__)))
+
+# Columns shared by the weekly and monthly bhavcopy history files
+STOCK_HISTORY_HEADERS = ["Symbol", "Series", "Date", "Prev Close", "Open Price",
+                         "High Price", "Low Price", "Last Price", "Close Price",
+                         "Average Price", "Total Traded Quantity", "Turnover ₹",
+                         "No. of Trades", "Deliverable Qty", "% Dly Qt to Traded Qty"]
+
+STOCK_HISTORY_COLUMNS = ["Symbol", "Date", "Prev Close", "Open Price", "High Price",
+                         "Low Price", "Close Price", "Total Traded Quantity",
+                         "Turnover ₹", "No. of Trades", "Deliverable Qty"]
+
+INDEX_HISTORY_HEADERS = ["Index Name", "Date", "Open", "High", "Low", "Close"]
+
+# Registry of every CSV the dashboard reads. "headers" are the expected
+# headers in file order after stripping BOMs and padding (a trailing "*"
+# matches any suffix, e.g. a date), "symbol_column" keys each row,
+# "usecols" are the columns the pages need, "text_columns" are read as
+# strings (all others as float64) and "date_formats" give the exact
+# format of each date column. History datasets also name their
+# open/high/low/close/volume columns in "ohlcv_columns".
+#
+# The *_daily files are the canonical daily series fed by ingest; the
+# older *_week and *_month downloads are still read and merged into it.
+SCHEMAS = {
+    "etf_daily": {
+        "filename": "etf_daily.csv",
+        "symbol_column": "Symbol",
+        "headers": STOCK_HISTORY_HEADERS,
+        "usecols": STOCK_HISTORY_COLUMNS,
+        "text_columns": ["Symbol", "Series", "Date"],
+        "date_formats": {"Date": "%d-%b-%Y"},
+        "ohlcv_columns": ["Open Price", "High Price", "Low Price", "Close Price", "Total Traded Quantity"]
+    },
+    "etf_week": {
+        "filename": "etf_week.csv",
+        "symbol_column": "Symbol",
+        "headers": STOCK_HISTORY_HEADERS,
+        "usecols": STOCK_HISTORY_COLUMNS,
+        "text_columns": ["Symbol", "Series", "Date"],
+        "date_formats": {"Date": "%d-%b-%Y"},
+        "ohlcv_columns": ["Open Price", "High Price", "Low Price", "Close Price", "Total Traded Quantity"]
+    },
+    "etf_month": {
+        "filename": "etf_month.csv",
+        "symbol_column": "Symbol",
+        "headers": STOCK_HISTORY_HEADERS,
+        "usecols": STOCK_HISTORY_COLUMNS,
+        "text_columns": ["Symbol", "Series", "Date"],
+        "date_formats": {"Date": "%d-%b-%Y"},
+        "ohlcv_columns": ["Open Price", "High Price", "Low Price", "Close Price", "Total Traded Quantity"]
+    },
+    "index_daily": {
+        "filename": "index_daily.csv",
+        "symbol_column": "Index Name",
+        "headers": INDEX_HISTORY_HEADERS,
+        "usecols": INDEX_HISTORY_HEADERS,
+        "text_columns": ["Index Name", "Date"],
+        "date_formats": {"Date": "%d %b %Y"},
+        "ohlcv_columns": ["Open", "High", "Low", "Close", None]
+    },
+    "index_week": {
+        "filename": "index_week.csv",
+        "symbol_column": "Index Name",
+        "headers": INDEX_HISTORY_HEADERS,
+        "usecols": INDEX_HISTORY_HEADERS,
+        "text_columns": ["Index Name", "Date"],
+        "date_formats": {"Date": "%d %b %Y"},
+        "ohlcv_columns": ["Open", "High", "Low", "Close", None]
+    },
+    "index_month": {
+        "filename": "index_month.csv",
+        "symbol_column": "Index Name",
+        "headers": INDEX_HISTORY_HEADERS,
+        "usecols": INDEX_HISTORY_HEADERS,
+        "text_columns": ["Index Name", "Date"],
+        "date_formats": {"Date": "%d %b %Y"},
+        "ohlcv_columns": ["Open", "High", "Low", "Close", None]
+    },
+    "high_low": {
+        "filename": "52W-high-low.csv",
+        "symbol_column": "SYMBOL",
+        "headers": ["SYMBOL", "SERIES", "Adjusted 52_Week_High", "52_Week_High_Date",
+                    "Adjusted 52_Week_Low", "52_Week_Low_DT"],
+        "usecols": ["SYMBOL", "Adjusted 52_Week_High", "Adjusted 52_Week_Low"],
+        "text_columns": ["SYMBOL", "SERIES", "52_Week_High_Date", "52_Week_Low_DT"],
+        "date_formats": {}
+    },
+    "pe": {
+        "filename": "PE.csv",
+        "symbol_column": "SYMBOL",
+        "headers": ["SYMBOL", "SYMBOL P/E", "ADJUSTED P/E"],
+        "usecols": ["SYMBOL", "ADJUSTED P/E"],
+        "text_columns": ["SYMBOL"],
+        "date_formats": {}
+    },
+    "traded": {
+        "filename": "StocksTraded.csv",
+        "symbol_column": "Symbol",
+        "headers": ["Symbol", "Series", "LTP", "%chng", "Mkt Cap (₹ Crores)",
+                    "Volume (Lakhs)", "Value (₹ Crores)"],
+        "usecols": ["Symbol", "LTP", "%chng", "Mkt Cap (₹ Crores)", "Volume (Lakhs)",
+                    "Value (₹ Crores)"],
+        "text_columns": ["Symbol", "Series"],
+        "date_formats": {}
+    },
+    "index_data": {
+        "filename": "index_data.csv",
+        "symbol_column": "SYMBOL",
+        "headers": ["SYMBOL", "OPEN", "HIGH", "LOW", "PREV. CLOSE", "LTP", "INDICATIVE CLOSE",
+                    "CHNG", "%CHNG", "VOLUME (shares)", "VALUE (₹ Crores)", "52W H", "52W L",
+                    "30 D %CHNG", "365 D % CHNG*"],
+        "usecols": ["SYMBOL", "LTP", "CHNG", "%CHNG", "VALUE (₹ Crores)", "52W H", "52W L"],
+        "text_columns": ["SYMBOL"],
+        "date_formats": {}
+    }
+}
+
+# Instrument type -> history datasets merged into its daily series, most
+# authoritative first
+DAILY_SOURCES = {
+    "etf": ["etf_daily", "etf_month", "etf_week"],
+    "index": ["index_daily", "index_month", "index_week"]
+}
+
+def normalize_header(header):
+    """Strip the BOM and padding exchange downloads add around header names"""
+    return header.replace('\ufeff', '').strip()
+
+def match_headers(raw_headers, expected_headers):
+    """Map raw file headers to their registry names, or None if they do not match"""
+    if len(raw_headers) != len(expected_headers):
+        return None
+    mapping = {}
+    for raw, expected in zip(raw_headers, expected_headers):
+        header = normalize_header(raw)
+        if expected.endswith('*'):
+            if not header.startswith(expected[:-1]):
+                return None
+            header = expected[:-1]
+        elif header != expected:
+            return None
+        mapping[raw] = header
+    return mapping
+
+def read_csv_with_schema(path, schema, usecols=None):
+    """Read a CSV with explicit dtypes, only the wanted columns and fixed date formats"""
+    raw_headers = list(pd.read_csv(path, nrows=0).columns)
+    mapping = match_headers(raw_headers, schema["headers"])
+    if mapping is None:
+        raise ValueError(f"Unexpected headers in {path}: expected {schema['headers']}, found {raw_headers}")
+    wanted = usecols or schema["usecols"]
+    selected = {raw: name for raw, name in mapping.items() if name in wanted}
+    dtypes = {raw: str if name in schema["text_columns"] else "float64" for raw, name in selected.items()}
+    df = pd.read_csv(path, usecols=list(selected), dtype=dtypes, thousands=',', na_values=['-'])
+    df = df.rename(columns=selected)[[name for name in wanted if name in selected.values()]]
+    for column, date_format in schema["date_formats"].items():
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column].str.strip(), format=date_format)
+    return df
+
+def normalize_frame(raw_df, schema, usecols=None):
+    """Convert a frame read with dtype=str into the typed columns read_csv_with_schema returns"""
+    mapping = match_headers(list(raw_df.columns), schema["headers"])
+    if mapping is None:
+        raise ValueError(f"Unexpected headers: expected {schema['headers']}, found {list(raw_df.columns)}")
+    wanted = usecols or schema["usecols"]
+    df = raw_df.rename(columns=mapping)[wanted]
+    for name in wanted:
+        values = df[name].str.strip()
+        if name in schema["date_formats"]:
+            df[name] = pd.to_datetime(values, format=schema["date_formats"][name])
+        elif name in schema["text_columns"]:
+            df[name] = values
+        else:
+            # Same result as thousands=',' and na_values=['-'] in read_csv
+            df[name] = pd.to_numeric(values.str.replace(',', '', regex=False), errors='coerce')
+    return df
+
+def empty_frame(schema, usecols=None):
+    """Empty frame with the columns and dtypes read_csv_with_schema would return"""
+    columns = {}
+    for name in usecols or schema["usecols"]:
+        if name in schema["date_formats"]:
+            columns[name] = pd.Series(dtype="datetime64[ns]")
+        elif name in schema["text_columns"]:
+            columns[name] = pd.Series(dtype=str)
+        else:
+            columns[name] = pd.Series(dtype="float64")
+    return pd.DataFrame(columns)
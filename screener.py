@@ -0,0 +1,59 @@
+import numpy as np
+import operator
+from types import MappingProxyType
+
+# Screenable field -> label. Fields are card table columns, plus the
+# distances from the 52-week high and low derived in build_screen_columns.
+SCREEN_FIELDS = {
+    "ltp": "Price (₹)",
+    "percent_change": "% Change",
+    "pe_ratio": "P/E",
+    "market_cap_value": "Market Cap (₹ Cr)",
+    "value_traded": "Value Traded (₹ Cr)",
+    "pct_below_52w_high": "% Below 52W High",
+    "pct_above_52w_low": "% Above 52W Low"
+}
+
+OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+# Build the numeric arrays the screener compares against
+def build_screen_columns(cards):
+    """One float array per screenable field over the traded symbols, plus their positions in the card table"""
+    traded = np.flatnonzero(cards["ltp"].notna().to_numpy())
+    columns = {field: cards[field].to_numpy(float)[traded]
+               for field in SCREEN_FIELDS if field in cards.columns}
+    ltp = columns["ltp"]
+    high = cards["week_52_high"].to_numpy(float)[traded]
+    low = cards["week_52_low"].to_numpy(float)[traded]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        columns["pct_below_52w_high"] = (high - ltp) / high * 100
+        columns["pct_above_52w_low"] = (ltp - low) / low * 100
+    for values in columns.values():
+        values.flags.writeable = False
+    traded.flags.writeable = False
+    return MappingProxyType(columns), traded
+
+def compile_filters(filters):
+    """Check (field, operator, value) filters and resolve their operators"""
+    compiled = []
+    for field, op, value in filters:
+        if field not in SCREEN_FIELDS:
+            raise ValueError(f"Unknown screener field: {field}")
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown screener operator: {op}")
+        compiled.append((field, OPERATORS[op], float(value)))
+    return compiled
+
+# Evaluate filters as one boolean mask
+def screen_mask(columns, filters):
+    """AND of every filter; a missing value never matches"""
+    mask = np.ones(len(next(iter(columns.values()))), dtype=bool)
+    for field, compare, value in compile_filters(filters):
+        mask &= compare(columns[field], value)
+    return mask
+
+def screen(columns, traded, filters):
+    """Card table positions of the symbols passing every filter"""
+    positions = traded[screen_mask(columns, filters)]
+    positions.flags.writeable = False
+    return positions